@@ -0,0 +1,46 @@
+##############################################################################
+#
+# Copyright (c) 2026 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Request-scoped caches
+"""
+
+
+def requestCache(request, key):
+    """Return the cache dictionary stored on `request` under `key`.
+
+    The dictionary lives in the request annotations, so it is shared by
+    all forms and widgets processing the request.  Requests without
+    annotations get a new, unshared dictionary on every call.
+    """
+    annotations = getattr(request, 'annotations', None)
+    if annotations is None:
+        return {}
+    cache = annotations.get(key)
+    if cache is None:
+        cache = annotations[key] = {}
+    return cache
+
+
+def contextCache(request, key, context):
+    """Return a dictionary for `context` from the request cache `key`.
+
+    The dictionary is shared by all callers passing the same context
+    object while the request is processed.
+    """
+    cache = requestCache(request, key)
+    cached = cache.get(id(context))
+    if cached is None or cached[0] is not context:
+        # Keep a reference to the context so that its id isn't reused
+        # while the request is processed.
+        cached = cache[id(context)] = (context, {})
+    return cached[1]
@@ -16,9 +16,13 @@ This module provides the `zope.formlib.interfaces.IFormAPI` interface.
 """
 import binascii
 import datetime
+import decimal
+import functools
+import hashlib
 import os
 import re
 import sys
+import time
 from html import escape
 
 import pytz
@@ -31,6 +35,7 @@ import zope.interface.interfaces
 import zope.publisher.browser
 import zope.publisher.interfaces.browser
 import zope.security
+import zope.security.checker
 from zope.browserpage import ViewPageTemplateFile
 from zope.browserpage import namedtemplate
 from zope.i18nmessageid import MessageFactory
@@ -47,12 +52,16 @@ from zope import component
 from zope import interface
 from zope import schema
 from zope.formlib import interfaces
+from zope.formlib._request import contextCache
+from zope.formlib._request import requestCache
+from zope.formlib.interfaces import ConversionError
 from zope.formlib.interfaces import IDisplayWidget
 from zope.formlib.interfaces import IInputWidget
 from zope.formlib.interfaces import InputErrors
 from zope.formlib.interfaces import InvalidCSRFTokenError
-from zope.formlib.interfaces import IWidgetInputErrorView
 from zope.formlib.interfaces import WidgetInputError
+from zope.formlib.widget import errorSnippet
+from zope.formlib.widget import getFormInputIndex
 
 
 _ = MessageFactory("zope")
@@ -150,8 +159,25 @@ class FormFields:
             seq.append(form_field)
             byname[name] = form_field
 
+        self._setFields(tuple(seq), byname)
+
+    def _setFields(self, seq, byname):
         self.__FormFields_seq__ = seq
         self.__FormFields_byname__ = byname
+        self.__FormFields_plans__ = {}
+        self.__FormFields_views__ = {}
+        self.__FormFields_invariants__ = None
+
+    def _derive(self, seq, byname):
+        """Return a new instance of the same class with validated fields.
+
+        Form fields are not copied and the constructor isn't called, so
+        deriving an instance only costs the size of the result.
+        """
+        cls = self.__class__
+        form_fields = cls.__new__(cls)
+        form_fields._setFields(seq, byname)
+        return form_fields
 
     def __len__(self):
         return len(self.__FormFields_seq__)
@@ -168,15 +194,39 @@ class FormFields:
     def __add__(self, other):
         if not isinstance(other, FormFields):
             return NotImplemented
-        return self.__class__(self, other)
+        byname = self.__FormFields_byname__.copy()
+        for form_field in other:
+            name = form_field.__name__
+            if name in byname:
+                raise ValueError("Duplicate name", name)
+            byname[name] = form_field
+        return self._derive(
+            self.__FormFields_seq__ + other.__FormFields_seq__, byname)
 
     def select(self, *names):
         """Return a modified instance with an ordered subset of fields."""
-        return self.__class__(*[self[name] for name in names])
+        key = 'select', names
+        form_fields = self.__FormFields_views__.get(key)
+        if form_fields is None:
+            byname = {}
+            for name in names:
+                if name in byname:
+                    raise ValueError("Duplicate name", name)
+                byname[name] = self[name]
+            form_fields = self.__FormFields_views__[key] = self._derive(
+                tuple(byname.values()), byname)
+        return form_fields
 
     def omit(self, *names):
         """Return a modified instance omitting given fields."""
-        return self.__class__(*[ff for ff in self if ff.__name__ not in names])
+        key = 'omit', names
+        form_fields = self.__FormFields_views__.get(key)
+        if form_fields is None:
+            seq = tuple(ff for ff in self if ff.__name__ not in names)
+            byname = {ff.__name__: ff for ff in seq}
+            form_fields = self.__FormFields_views__[key] = self._derive(
+                seq, byname)
+        return form_fields
 
 
 Fields = FormFields
@@ -242,16 +292,249 @@ class Widgets:
         return widgets
 
 
-def canWrite(context, field):
+class LazyWidgets(Widgets):
+    """Widgets that are only set up when they are used.
+
+    `setups` is a sequence of ``(name, setup)`` pairs.  `setup` is called
+    without arguments the first time the widget is needed, either by name
+    or while iterating, and returns an ``(input, widget)`` pair.
+
+    The names must be known in advance, so this only works for widgets
+    that use the standard naming scheme.  A `ValueError` is raised when a
+    widget is set up whose name doesn't match its name with `prefix`.
+
+    `Widgets.__init__` isn't called: the state it sets up is computed on
+    demand by the properties below.
+    """
+
+    def __init__(self, setups, prefix):
+        self.__LazyWidgets_setups__ = setups
+        self.__LazyWidgets_prefix__ = expandPrefix(prefix)
+        self.__LazyWidgets_index__ = {
+            name: i for i, (name, setup) in enumerate(setups)}
+        self.__LazyWidgets_items__ = [None] * len(setups)
+
+    def _setUp(self, i):
+        item = self.__LazyWidgets_items__[i]
+        if item is None:
+            name, setup = self.__LazyWidgets_setups__[i]
+            item = setup()
+            widget = item[1]
+            if _widgetKey(widget, self.__LazyWidgets_prefix__) != name:
+                raise ValueError("Name does not match form field",
+                                 widget.name, name)
+            self.__LazyWidgets_items__[i] = item
+        return item
+
+    def __iter__(self):
+        for input, widget in self.__iter_input_and_widget__():
+            yield widget
+
+    def __getitem__(self, name):
+        return self._setUp(self.__LazyWidgets_index__[name])[1]
+
+    def get(self, name):
+        i = self.__LazyWidgets_index__.get(name)
+        if i is None:
+            return None
+        return self._setUp(i)[1]
+
+    def __iter_input_and_widget__(self):
+        for i in range(len(self.__LazyWidgets_setups__)):
+            yield self._setUp(i)
+
+    # Used by `Widgets.__add__`; these set up all widgets.
+
+    @property
+    def __Widgets_widgets_items__(self):
+        return list(self.__iter_input_and_widget__())
+
+    @property
+    def __Widgets_widgets_list__(self):
+        return list(self)
+
+    @property
+    def __Widgets_widgets_dict__(self):
+        return {name: self[name] for name in self.__LazyWidgets_index__}
+
+    def __add__(self, other):
+        widgets = Widgets([], 0)
+        return widgets + self + other
+
+
+def _plannedState(form_field):
+    """Return the attributes of `form_field` a `FieldPlan` depends on."""
+    field = form_field.field
+    return (field.__name__, field.readonly, form_field.interface,
+            form_field.render_context, form_field.prefix,
+            form_field.for_display, form_field.for_input)
+
+
+class FieldPlan:
+    """Request-independent widget setup information for one form field."""
+
+    def __init__(self, form_field, form_prefix):
+        self.form_field = form_field
+        self.field = form_field.field
+        self.state = _plannedState(form_field)
+        self.interface = form_field.interface
+        self.render_context = form_field.render_context
+
+        prefix = form_prefix
+        if form_field.prefix:
+            prefix = expandPrefix(prefix) + form_field.prefix
+        self.widget_prefix = prefix
+
+        # The key of the widget in `Widgets`, assuming the widget uses
+        # the standard naming scheme.
+        self.key = (expandPrefix(prefix) + self.field.__name__)[
+            len(expandPrefix(form_prefix)):]
+
+        self.readonly = bool(
+            form_field.for_display
+            or (self.field.readonly and not form_field.for_input))
+        self.check_writable = bool(
+            self.render_context
+            and self.render_context & interfaces.DISPLAY_UNWRITEABLE)
+        self.write_key = _writeKey(self.field)
+
+
+class FormPlan:
+    """Request-independent widget setup information for form fields.
+
+    Everything that only depends on the form fields and the form prefix
+    is computed once, so that setting up the widgets for a request only
+    has to deal with the context and the request.
+    """
+
+    def __init__(self, form_fields, form_prefix):
+        self.form_prefix = form_prefix
+        self.fields = tuple(FieldPlan(form_field, form_prefix)
+                            for form_field in form_fields)
+        # The fields whose write permission is checked, by schema.
+        self.checked_fields = {}
+        for plan in self.fields:
+            if plan.check_writable:
+                self.checked_fields.setdefault(
+                    plan.interface, []).append(plan.field)
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def isCurrent(self):
+        """Return whether the form fields still match the plan.
+
+        Form fields are mutable; the plan is out of date if one of the
+        attributes it was computed from changed.
+        """
+        for plan in self.fields:
+            form_field = plan.form_field
+            if (form_field.field is not plan.field
+                    or _plannedState(form_field) != plan.state):
+                return False
+        return True
+
+
+def getFormPlan(form_fields, form_prefix):
+    """Return the `FormPlan` for `form_fields` used with `form_prefix`.
+
+    Plans for `FormFields` instances are cached on the instance and
+    computed again if a form field changed (see `FormPlan.isCurrent`).
+    Plans are immutable, so concurrent requests can share them; at
+    worst, two threads compute the same plan.
+    """
+    plans = getattr(form_fields, '__FormFields_plans__', None)
+    if plans is None:
+        return FormPlan(form_fields, form_prefix)
+    plan = plans.get(form_prefix)
+    if plan is None or not plan.isCurrent():
+        plan = plans[form_prefix] = FormPlan(form_fields, form_prefix)
+    return plan
+
+
+def getSchemaAdapters(context, request):
+    """See `zope.formlib.interfaces.IFormAPI.getSchemaAdapters`"""
+    return contextCache(request, 'zope.formlib.adapters', context)
+
+
+def _adapt(context, interface, adapters):
+    """Adapt `context` to the schema `interface`, using `adapters` as cache.
+    """
+    adapter = adapters.get(interface)
+    if adapter is None:
+        if interface is None:
+            adapter = context
+        else:
+            adapter = interface(context)
+        adapters[interface] = adapter
+        if interface is not None:
+            adapters[interface.__name__] = adapter
+    return adapter
+
+
+def _writeKey(field):
     writer = getattr(field, 'writer', None)
     if writer is not None:
-        return zope.security.canAccess(context, writer.__name__)
-    return zope.security.canWrite(context, field.__name__)
+        return 'access', writer.__name__
+    return 'write', field.__name__
+
+
+def _checkWrite(context, fields, decisions):
+    """Add the missing write permission decisions for `fields` on `context`.
+
+    The context is security proxied only once for all fields.
+    """
+    proxy = None
+    for field in fields:
+        key = _writeKey(field)
+        if key in decisions:
+            continue
+        if proxy is None:
+            proxy = zope.security.checker.ProxyFactory(context)
+        kind, name = key
+        if kind == 'access':
+            decisions[key] = zope.security.canAccess(proxy, name)
+        else:
+            decisions[key] = zope.security.canWrite(proxy, name)
+
+
+def canWrite(context, field):
+    decisions = {}
+    _checkWrite(context, (field, ), decisions)
+    return decisions[_writeKey(field)]
+
+
+def canWriteFields(context, fields, request):
+    """See `zope.formlib.interfaces.IFormAPI.canWriteFields`"""
+    decisions = contextCache(request, 'zope.formlib.canWrite', context)
+    _checkWrite(context, fields, decisions)
+    return {field.__name__: decisions[_writeKey(field)] for field in fields}
+
+
+def forgetWriteDecisions(request):
+    """See `zope.formlib.interfaces.IFormAPI.forgetWriteDecisions`"""
+    requestCache(request, 'zope.formlib.canWrite').clear()
+
+
+def _canWritePlan(adapter, plan, form_plan, request):
+    """Decide whether the field of `plan` is writable on `adapter`.
+
+    Decisions are remembered for the request.  On the first miss, all
+    fields of the form that are checked against the same schema are
+    decided together.
+    """
+    decisions = contextCache(request, 'zope.formlib.canWrite', adapter)
+    allowed = decisions.get(plan.write_key)
+    if allowed is None:
+        _checkWrite(adapter, form_plan.checked_fields[plan.interface],
+                    decisions)
+        allowed = decisions[plan.write_key]
+    return allowed
 
 
 def setUpWidgets(form_fields,
                  form_prefix=None, context=None, request=None, form=None,
-                 data=(), adapters=None, ignore_request=False):
+                 data=(), adapters=None, ignore_request=False, lazy=False):
     """Sets up widgets."""
     if request is None:
         request = form.request
@@ -259,36 +542,25 @@ def setUpWidgets(form_fields,
         context = form.context
     if form_prefix is None:
         form_prefix = form.prefix
-
-    widgets = []
-    adapter = None
-    for form_field in form_fields:
-        field = form_field.field
-        if form_field.render_context:
-            if adapters is None:
-                adapters = {}
-
+    if adapters is None:
+        adapters = {}
+    form_plan = getFormPlan(form_fields, form_prefix)
+    form_input = not ignore_request and _hasFormInput(request, form_prefix)
+
+    def setUp(plan):
+        form_field = plan.form_field
+        field = plan.field
+        adapter = None
+        if plan.render_context:
             # Adapt context, if necessary
-            interface = form_field.interface
-            adapter = adapters.get(interface)
-            if adapter is None:
-                if interface is None:
-                    adapter = context
-                else:
-                    adapter = interface(context)
-                adapters[interface] = adapter
-                if interface is not None:
-                    adapters[interface.__name__] = adapter
+            adapter = _adapt(context, plan.interface, adapters)
             field = field.bind(adapter)
         else:
             field = field.bind(context)
 
-        readonly = form_field.for_display
-        readonly = readonly or (field.readonly and not form_field.for_input)
-        readonly = readonly or (
-            (form_field.render_context & interfaces.DISPLAY_UNWRITEABLE)
-            and not canWrite(adapter, field)
-        )
+        readonly = plan.readonly or (
+            plan.check_writable
+            and not _canWritePlan(adapter, plan, form_plan, request))
 
         if form_field.custom_widget is not None:
             widget = form_field.custom_widget(field, request)
@@ -300,40 +572,33 @@ def setUpWidgets(form_fields,
                 widget = component.getMultiAdapter((field, request),
                                                    IInputWidget)
 
-        prefix = form_prefix
-        if form_field.prefix:
-            prefix = expandPrefix(prefix) + form_field.prefix
+        widget.setPrefix(plan.widget_prefix)
 
-        widget.setPrefix(prefix)
-
-        if ignore_request or readonly or not widget.hasInput():
+        if (ignore_request or readonly
+                or not _widgetHasInput(widget, form_input)):
             # Get the value to render
             if form_field.__name__ in data:
                 widget.setRenderedValue(data[form_field.__name__])
             elif form_field.get_rendered is not None:
                 widget.setRenderedValue(form_field.get_rendered(form))
-            elif form_field.render_context:
+            elif plan.render_context:
                 widget.setRenderedValue(field.get(adapter))
             else:
                 widget.setRenderedValue(field.default)
 
-        widgets.append((not readonly, widget))
+        return not readonly, widget
 
-    return Widgets(widgets, prefix=form_prefix)
+    return _makeWidgets(form_plan, setUp, form_prefix, lazy)
 
 
 def setUpInputWidgets(form_fields, form_prefix, context, request,
-                      form=None, ignore_request=False):
-    widgets = []
-    for form_field in form_fields:
-        field = form_field.field.bind(context)
-        widget = _createWidget(form_field, field, request, IInputWidget)
-
-        prefix = form_prefix
-        if form_field.prefix:
-            prefix = expandPrefix(prefix) + form_field.prefix
+                      form=None, ignore_request=False, lazy=False):
 
-        widget.setPrefix(prefix)
+    def setUp(plan):
+        form_field = plan.form_field
+        field = plan.field.bind(context)
+        widget = _createWidget(form_field, field, request, IInputWidget)
+        widget.setPrefix(plan.widget_prefix)
 
         if ignore_request:
             if form_field.get_rendered is not None:
@@ -342,8 +607,34 @@ def setUpInputWidgets(form_fields, form_prefix, context, request,
                 value = field.default
             widget.setRenderedValue(value)
 
-        widgets.append((True, widget))
-    return Widgets(widgets, prefix=form_prefix)
+        return True, widget
+
+    return _makeWidgets(
+        getFormPlan(form_fields, form_prefix), setUp, form_prefix, lazy)
+
+
+def _hasFormInput(request, form_prefix):
+    """Return whether any input was submitted for the form `form_prefix`.
+
+    Widgets read their input from form variables starting with their
+    name, which starts with the form prefix.  If there are none, asking
+    these widgets whether they have input can be skipped (see
+    `_widgetHasInput`).
+    """
+    return getFormInputIndex(request).hasInput(expandPrefix(form_prefix))
+
+
+def _widgetHasInput(widget, form_input):
+    """Return whether `widget` has input.
+
+    `form_input` is the result of `_hasFormInput`.  Only widgets that
+    declare that they read their input from the form variables starting
+    with their name (like browser widgets) aren't asked if it is false;
+    other widgets may look elsewhere in the request.
+    """
+    if not form_input and getattr(widget, '_form_input_only', False):
+        return False
+    return widget.hasInput()
 
 
 def _createWidget(form_field, field, request, iface):
@@ -353,10 +644,102 @@ def _createWidget(form_field, field, request, iface):
         return form_field.custom_widget(field, request)
 
 
-def getWidgetsData(widgets, form_prefix, data):
+def _makeWidgets(form_plan, setUp, form_prefix, lazy):
+    """Create the widgets for `form_plan`.
+
+    `setUp` is called with a field plan and returns an ``(input, widget)``
+    pair.  If `lazy` is true, it is only called when the widget is used.
+    """
+    if lazy:
+        return LazyWidgets(
+            [(plan.key, functools.partial(setUp, plan))
+             for plan in form_plan],
+            prefix=form_prefix)
+    return Widgets([setUp(plan) for plan in form_plan], prefix=form_prefix)
+
+
+def errorKind(error):
+    """Return the kind of `error` as listed by `IFormErrors`."""
+    if isinstance(error, ConversionError):
+        return 'conversion'
+    if isinstance(error, InvalidCSRFTokenError):
+        return 'csrf'
+    if isinstance(error, (WidgetInputError, ValidationError)):
+        return 'validation'
+    if isinstance(error, interface.Invalid):
+        return 'invariant'
+    return 'other'
+
+
+class _ErrorList(list):
+    """Errors collected by `getWidgetsData` and `checkInvariants`.
+
+    The list remembers the widget name and kind of the errors it was
+    filled with, so that `FormErrors` don't need to guess them.
+    """
+
+    def __init__(self, errors=()):
+        super().__init__(errors)
+        self.__FormErrors_info__ = dict(
+            getattr(errors, '__FormErrors_info__', ()))
+
+    def add(self, error, name=None, kind=None):
+        self.append(error)
+        self.__FormErrors_info__[id(error)] = (
+            name, kind or errorKind(error))
+
+    def __add__(self, other):
+        result = _ErrorList(self)
+        result.extend(other)
+        result.__FormErrors_info__.update(
+            getattr(other, '__FormErrors_info__', ()))
+        return result
+
+    def __radd__(self, other):
+        return _ErrorList(other) + self
+
+
+@interface.implementer(interfaces.IFormErrors)
+class FormErrors(tuple):
+    """Implementation of `zope.formlib.interfaces.IFormErrors`.
+
+    The index is built once, when the errors are created.  The widget
+    names and kinds recorded by `getWidgetsData` and `checkInvariants`
+    are used; the kind of other errors is determined by `errorKind`.
+    """
+
+    def __new__(cls, errors=()):
+        self = super().__new__(cls, errors)
+        recorded = getattr(errors, '__FormErrors_info__', {})
+        info = self.__FormErrors_info__ = {}
+        names = self.__FormErrors_names__ = {}
+        kinds = self.__FormErrors_kinds__ = {}
+        for error in self:
+            name, kind = info[id(error)] = (
+                recorded.get(id(error)) or (None, errorKind(error)))
+            if name is not None:
+                names.setdefault(name, []).append(error)
+            kinds.setdefault(kind, []).append(error)
+        return self
+
+    def forWidget(self, name):
+        return tuple(self.__FormErrors_names__.get(name, ()))
+
+    def ofKind(self, kind):
+        return tuple(self.__FormErrors_kinds__.get(kind, ()))
+
+    def __add__(self, other):
+        return FormErrors(_ErrorList(self) + other)
+
+    def __radd__(self, other):
+        return FormErrors(_ErrorList(other) + self)
+
+
+def getWidgetsData(widgets, form_prefix, data, form=None):
     """See `zope.formlib.interfaces.IFormAPI.getWidgetsData`"""
-    errors = []
+    errors = _ErrorList()
     form_prefix = expandPrefix(form_prefix)
+    instrumentation = _getInstrumentation()
 
     for input, widget in widgets.__iter_input_and_widget__():
         if input and IInputWidget.providedBy(widget):
@@ -366,17 +749,95 @@ def getWidgetsData(widgets, form_prefix, data):
                 continue
 
             try:
-                data[name] = widget.getInputValue()
+                data[name] = _timed(instrumentation, form, 'getInputValue',
+                                    widget.getInputValue, widget=widget)
             except ValidationError as error:
                 # convert field ValidationError to WidgetInputError
                 error = WidgetInputError(widget.name, widget.label, error)
-                errors.append(error)
+                errors.add(error, widget.name)
             except InputErrors as error:
-                errors.append(error)
+                errors.add(error, widget.name)
 
     return errors
 
 
+def _getInstrumentation():
+    """Return the registered `IFormInstrumentation` utility, if any."""
+    return component.queryUtility(interfaces.IFormInstrumentation)
+
+
+def _timed(instrumentation, form, phase, func, *args, widget=None):
+    """Call `func` with `args` and record how long it took.
+
+    If `instrumentation` is None, `func` is just called.
+    """
+    if instrumentation is None:
+        return func(*args)
+    start = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        instrumentation.record(form, phase, time.perf_counter() - start,
+                               widget)
+
+
+class _InstrumentedWidget:
+    """Widget wrapper recording how long rendering the widget takes."""
+
+    def __init__(self, widget, form, instrumentation):
+        self.__dict__.update(_widget=widget, _form=form,
+                             _instrumentation=instrumentation)
+
+    def __getattr__(self, name):
+        return getattr(self._widget, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._widget, name, value)
+
+    @property
+    def __providedBy__(self):
+        return interface.providedBy(self._widget)
+
+    def __call__(self):
+        return _timed(self._instrumentation, self._form, 'renderWidget',
+                      self._widget, widget=self._widget)
+
+    def renderInto(self, out):
+        _timed(self._instrumentation, self._form, 'renderWidget',
+               self._widget.renderInto, out, widget=self._widget)
+
+
+def _instrumentWidgets(widgets, form, instrumentation):
+    """Return `widgets` with widgets recording their rendering time.
+
+    Lazy widgets are only set up and wrapped when they are used.
+    """
+    if isinstance(widgets, LazyWidgets):
+        def setUp(i):
+            input, widget = widgets._setUp(i)
+            return input, _InstrumentedWidget(widget, form, instrumentation)
+
+        return LazyWidgets(
+            [(name, functools.partial(setUp, i))
+             for i, (name, setup) in enumerate(
+                 widgets.__LazyWidgets_setups__)],
+            widgets.__LazyWidgets_prefix__)
+
+    wrappers = {}
+    items = []
+    for input, widget in widgets.__iter_input_and_widget__():
+        wrapper = wrappers[id(widget)] = _InstrumentedWidget(
+            widget, form, instrumentation)
+        items.append((input, wrapper))
+    result = Widgets([], 0)
+    result.__Widgets_widgets_items__ = items
+    result.__Widgets_widgets_list__ = [w for (i, w) in items]
+    result.__Widgets_widgets_dict__ = {
+        name: wrappers[id(widget)]
+        for name, widget in widgets.__Widgets_widgets_dict__.items()}
+    return result
+
+
 def _widgetKey(widget, form_prefix):
     name = widget.name
     if name.startswith(form_prefix):
@@ -388,77 +849,119 @@ def _widgetKey(widget, form_prefix):
 
 def setUpEditWidgets(form_fields, form_prefix, context, request,
                      adapters=None, for_display=False,
-                     ignore_request=False):
+                     ignore_request=False, lazy=False, fingerprints=None):
     if adapters is None:
         adapters = {}
+    form_plan = getFormPlan(form_fields, form_prefix)
+    form_input = not ignore_request and _hasFormInput(request, form_prefix)
 
-    widgets = []
-    for form_field in form_fields:
-        field = form_field.field
+    def setUp(plan):
+        form_field = plan.form_field
         # Adapt context, if necessary
-        interface = form_field.interface
-        adapter = adapters.get(interface)
-        if adapter is None:
-            if interface is None:
-                adapter = context
-            else:
-                adapter = interface(context)
-            adapters[interface] = adapter
-            if interface is not None:
-                adapters[interface.__name__] = adapter
-
-        field = field.bind(adapter)
-
-        readonly = form_field.for_display
-        readonly = readonly or (field.readonly and not form_field.for_input)
-        readonly = readonly or (
-            (form_field.render_context & interfaces.DISPLAY_UNWRITEABLE)
-            and not canWrite(adapter, field)
-        )
-        readonly = readonly or for_display
+        adapter = _adapt(context, plan.interface, adapters)
+        field = plan.field.bind(adapter)
+
+        readonly = for_display or plan.readonly or (
+            plan.check_writable
+            and not _canWritePlan(adapter, plan, form_plan, request))
 
         if readonly:
             iface = IDisplayWidget
         else:
             iface = IInputWidget
         widget = _createWidget(form_field, field, request, iface)
+        widget.setPrefix(plan.widget_prefix)
 
-        prefix = form_prefix
-        if form_field.prefix:
-            prefix = expandPrefix(prefix) + form_field.prefix
-
-        widget.setPrefix(prefix)
-
-        if ignore_request or readonly or not widget.hasInput():
+        if (ignore_request or readonly
+                or not _widgetHasInput(widget, form_input)):
             # Get the value to render
             value = field.get(adapter)
             widget.setRenderedValue(value)
+            if fingerprints is not None and not readonly:
+                digest = fingerprint(value)
+                if digest is None:
+                    fingerprints.pop(form_field.__name__, None)
+                else:
+                    fingerprints[form_field.__name__] = digest
 
-        widgets.append((not readonly, widget))
+        return not readonly, widget
 
-    return Widgets(widgets, prefix=form_prefix)
+    return _makeWidgets(form_plan, setUp, form_prefix, lazy)
+
+
+_fingerprint_types = frozenset((
+    str, bytes, bool, int, float, decimal.Decimal, datetime.date,
+    datetime.datetime, datetime.time, datetime.timedelta, type(None)))
+
+
+def _fingerprintRepr(value):
+    cls = type(value)
+    if cls in _fingerprint_types:
+        return repr(value)
+    if cls in (tuple, list, set, frozenset):
+        items = []
+        for item in value:
+            item = _fingerprintRepr(item)
+            if item is None:
+                return None
+            items.append(item)
+        if cls in (set, frozenset):
+            items.sort()
+        return '{}({})'.format(cls.__name__, ', '.join(items))
+    return None
+
+
+def fingerprint(value):
+    """Return a short digest of a field value, or None.
+
+    Only values of built-in types whose representation identifies them
+    (strings, numbers, dates and times, None and collections of these)
+    are fingerprinted.  The digest is the same in all processes.
+    """
+    text = _fingerprintRepr(value)
+    if text is None:
+        return None
+    return hashlib.blake2b(
+        text.encode('utf-8', 'surrogatepass'), digest_size=8).hexdigest()
+
+
+def parseFingerprints(text):
+    """Parse fingerprints rendered by `formatFingerprints`.
+
+    Malformed entries are ignored.
+    """
+    fingerprints = {}
+    for entry in (text or '').split():
+        name, sep, digest = entry.rpartition('=')
+        if sep and name:
+            fingerprints[name] = digest
+    return fingerprints
+
+
+def formatFingerprints(fingerprints):
+    """Format a mapping of form field names to fingerprints as text."""
+    return ' '.join('{}={}'.format(name, digest)
+                    for name, digest in sorted(fingerprints.items()))
 
 
 def setUpDataWidgets(form_fields, form_prefix, context, request, data=(),
                      for_display=False, ignore_request=False):
+    form_input = not ignore_request and _hasFormInput(request, form_prefix)
     widgets = []
-    for form_field in form_fields:
-        field = form_field.field.bind(context)
+    for plan in getFormPlan(form_fields, form_prefix):
+        form_field = plan.form_field
+        field = plan.field.bind(context)
         readonly = for_display or field.readonly or form_field.for_display
         if readonly:
             iface = IDisplayWidget
         else:
             iface = IInputWidget
         widget = _createWidget(form_field, field, request, iface)
-
-        prefix = form_prefix
-        if form_field.prefix:
-            prefix = expandPrefix(prefix) + form_field.prefix
-
-        widget.setPrefix(prefix)
+        widget.setPrefix(plan.widget_prefix)
 
         if ((form_field.__name__ in data)
-                and (ignore_request or readonly or not widget.hasInput())):
+                and (ignore_request or readonly
+                     or not _widgetHasInput(widget, form_input))):
             widget.setRenderedValue(data[form_field.__name__])
 
         widgets.append((not readonly, widget))
@@ -481,13 +984,31 @@ class NoInputData(interface.Invalid):
 
 
 class FormData:
+    """The data of a schema passed to its invariants.
+
+    Values are taken from the form data or, if they weren't submitted,
+    from the context adapted to the schema.  Values are looked up once.
+    """
 
-    def __init__(self, schema, data, context):
+    __slots__ = ('_FormData_data___', '_FormData_schema___',
+                 '_FormData_context___', '_FormData_adapters___',
+                 '_FormData_values___')
+
+    def __init__(self, schema, data, context, adapters=None):
         self._FormData_data___ = data
         self._FormData_schema___ = schema
         self._FormData_context___ = context
+        if adapters is None:
+            adapters = {}
+        self._FormData_adapters___ = adapters
+        self._FormData_values___ = {}
 
     def __getattr__(self, name):
+        values = self._FormData_values___
+        try:
+            return values[name]
+        except KeyError:
+            pass
         schema = self._FormData_schema___
         data = self._FormData_data___
         context = self._FormData_context___
@@ -501,8 +1022,8 @@ class FormData:
                 if context is None:
                     raise NoInputData(name)
                 # The value is not in the form look it up on the context:
-                field = schema[name]
-                adapted_context = schema(context)
+                adapted_context = _adapt(
+                    context, schema, self._FormData_adapters___)
                 if IField.providedBy(field):
                     value = field.get(adapted_context)
                 elif (zope.interface.interfaces.IAttribute.providedBy(field)
@@ -521,70 +1042,195 @@ class FormData:
                 def v(): return value
             else:
                 v = value
-            setattr(self, name, v)
+            values[name] = v
             return v
         raise AttributeError(name)
 
 
-def checkInvariants(form_fields, form_data, context):
-    """See `zope.formlib.interfaces.IFormAPI.checkInvariants`"""
+def _defaultValidation(schema):
+    """Return whether `schema` uses the default invariant validation."""
+    return (type(schema).validateInvariants
+            is InterfaceClass.validateInvariants)
+
+
+def _invariants(schema):
+    """Return the invariants `schema` validates, in order."""
+    return [invariant
+            for iface in schema.__iro__
+            for invariant in iface.queryDirectTaggedValue('invariants', ())]
+
+
+def _hasInvariants(schema):
+    """Return whether `schema` or one of its bases declares invariants."""
+    if not _defaultValidation(schema):
+        # Custom validation, we can't tell.
+        return True
+    return bool(_invariants(schema))
+
+
+def invariantDependsOn(*names):
+    """Declare the names of the fields an invariant reads.
+
+    Apply it below ``zope.interface.invariant``::
+
+      @invariant
+      @invariantDependsOn('min_size', 'max_size')
+      def maxGreaterThanMin(order):
+          ...
+
+    The declaration is used by `checkInvariants` to skip invariants that
+    aren't affected by the submitted data (see `skip_unaffected`).  It
+    must name every field the invariant may read, also those it only
+    reads under some conditions.
+    """
+    def decorator(func):
+        func.depends_on = frozenset(names)
+        return func
+    return decorator
+
+
+def getInvariantDependencies(invariant):
+    """Return the names of the fields `invariant` reads, if declared.
 
-    # First, collect the data for the various schemas
-    schema_data = {}
+    These are the names declared with `invariantDependsOn`.  None is
+    returned for invariants that don't declare their dependencies.
+    """
+    return getattr(invariant, 'depends_on', None)
+
+
+def _validateAffectedInvariants(schema, form_data, data, context, adapters,
+                                errors):
+    """Check the invariants of `schema` affected by `data`.
+
+    An invariant with declared dependencies (see
+    `getInvariantDependencies`) is affected if one of them was submitted
+    and, given a context, the submitted value differs from the value of
+    the context.  Other invariants are always affected.
+    """
+    changed = {}
+    for invariant in _invariants(schema):
+        depends_on = getInvariantDependencies(invariant)
+        if depends_on is not None:
+            submitted = [name for name in depends_on if name in data]
+            if not submitted:
+                continue
+            if context is not None:
+                for name in submitted:
+                    if name not in changed:
+                        changed[name] = _hasChanged(
+                            schema, name, data[name], context, adapters)
+                    if changed[name]:
+                        break
+                else:
+                    continue
+
+        try:
+            invariant(form_data)
+        except interface.Invalid as error:
+            errors.append(error)
+
+
+def _hasChanged(schema, name, value, context, adapters):
+    """Return whether `value` differs from the value of the context."""
+    field = schema.get(name)
+    if not IField.providedBy(field):
+        return True
+    return field.get(_adapt(context, schema, adapters)) != value
+
+
+def getInvariantSchemas(form_fields):
+    """Return the schemas of `form_fields` that have invariants.
+
+    The result is a tuple of ``(schema, names)`` pairs in the order the
+    schemas are used by the form fields.  `names` is a tuple of
+    ``(form field name, field name)`` pairs for the form fields of the
+    schema.  Schemas without invariants (including inherited ones) are
+    left out.
+
+    Like form plans (see `getFormPlan`), the result is cached on
+    `FormFields` instances.
+    """
+    schemas = getattr(form_fields, '__FormFields_invariants__', None)
+    if schemas is not None:
+        return schemas
+
+    schema_names = {}
     for form_field in form_fields:
-        schema = form_field.interface
-        if schema is None:
+        iface = form_field.interface
+        if iface is None:
             continue
+        schema_names.setdefault(iface, []).append(
+            (form_field.__name__, form_field.field.__name__))
+    schemas = tuple((iface, tuple(names))
+                    for iface, names in schema_names.items()
+                    if _hasInvariants(iface))
 
-        data = schema_data.get(schema)
-        if data is None:
-            data = schema_data[schema] = {}
+    if isinstance(form_fields, FormFields):
+        form_fields.__FormFields_invariants__ = schemas
+    return schemas
 
-        if form_field.__name__ in form_data:
-            data[form_field.field.__name__] = form_data[form_field.__name__]
 
-    # Now validate the individual schemas
+def checkInvariants(form_fields, form_data, context, adapters=None,
+                    skip_unaffected=False):
+    """See `zope.formlib.interfaces.IFormAPI.checkInvariants`"""
+    if adapters is None:
+        adapters = {}
+
     errors = []
-    for schema, data in schema_data.items():
+    for iface, names in getInvariantSchemas(form_fields):
+        data = {name: form_data[key]
+                for key, name in names if key in form_data}
+        schema_data = FormData(iface, data, context, adapters)
+        if skip_unaffected and _defaultValidation(iface):
+            _validateAffectedInvariants(
+                iface, schema_data, data, context, adapters, errors)
+            continue
         try:
-            schema.validateInvariants(FormData(schema, data, context), errors)
+            iface.validateInvariants(schema_data, errors)
         except interface.Invalid:
             pass  # Just collect the errors
 
-    return [error for error in errors if not isinstance(error, NoInputData)]
+    result = _ErrorList()
+    for error in errors:
+        if not isinstance(error, NoInputData):
+            result.add(error, kind='invariant')
+    return result
 
 
-def applyData(context, form_fields, data, adapters=None):
+def applyData(context, form_fields, data, adapters=None, fingerprints=None):
     if adapters is None:
         adapters = {}
 
     descriptions = {}
 
     for form_field in form_fields:
+        name = form_field.__name__
+        newvalue = data.get(name, form_field)  # using form_field as marker
+        if newvalue is form_field:
+            continue
+        if fingerprints:
+            digest = fingerprints.get(name)
+            if digest is not None and digest == fingerprint(newvalue):
+                # The value wasn't changed in the form.
+                continue
+
         field = form_field.field
         # Adapt context, if necessary
         interface = form_field.interface
-        adapter = adapters.get(interface)
-        if adapter is None:
-            if interface is None:
-                adapter = context
-            else:
-                adapter = interface(context)
-            adapters[interface] = adapter
+        adapter = _adapt(context, interface, adapters)
 
-        name = form_field.__name__
-        newvalue = data.get(name, form_field)  # using form_field as marker
-        if (newvalue is not form_field) \
-                and (field.get(adapter) != newvalue):
+        if field.get(adapter) != newvalue:
             descriptions.setdefault(interface, []).append(field.__name__)
             field.set(adapter, newvalue)
 
     return descriptions
 
 
-def applyChanges(context, form_fields, data, adapters=None):
+def applyChanges(context, form_fields, data, adapters=None,
+                 fingerprints=None):
     """See `zope.formlib.interfaces.IFormAPI.applyChanges`"""
-    return bool(applyData(context, form_fields, data, adapters))
+    return bool(applyData(context, form_fields, data, adapters,
+                          fingerprints))
 
 
 def _callify(meth):
@@ -596,6 +1242,24 @@ def _callify(meth):
         return lambda form, *args: getattr(form, meth)(*args)
 
 
+_bound_action_specs = {}
+
+
+def _boundActionSpec(cls):
+    """Return the declaration for bound actions of class `cls`.
+
+    Bound actions are created often, so the declaration adding
+    `IBoundAction` is computed once per class.  A subclass for bound
+    actions isn't used, because security checkers are looked up by
+    the exact class.
+    """
+    spec = _bound_action_specs.get(cls)
+    if spec is None:
+        spec = _bound_action_specs[cls] = interface.declarations.Provides(
+            cls, interfaces.IBoundAction)
+    return spec
+
+
 @interface.implementer(interfaces.IAction)
 class Action:
     """See `zope.formlib.interfaces.IAction`"""
@@ -644,16 +1308,29 @@ class Action:
     def __get__(self, form, class_=None):
         if form is None:
             return self
-        result = self.__class__.__new__(self.__class__)
+        cls = self.__class__
+        result = cls.__new__(cls)
         result.__dict__.update(self.__dict__)
         result.form = form
         result.__name__ = expandPrefix(form.prefix) + result.__name__
-        interface.alsoProvides(result, interfaces.IBoundAction)
+        if '__provides__' in self.__dict__:
+            # The action provides interfaces directly.
+            interface.alsoProvides(result, interfaces.IBoundAction)
+        else:
+            result.__provides__ = _boundActionSpec(cls)
         return result
 
     def available(self):
+        # The outcome is remembered until the form state changes, see
+        # `forgetAvailability`.
+        try:
+            return self.__dict__['_available']
+        except KeyError:
+            pass
         condition = self.condition
-        return (condition is None) or condition(self.form, self)
+        available = (condition is None) or condition(self.form, self)
+        self._available = available
+        return available
 
     def validate(self, data):
         if self.validator is not None:
@@ -741,12 +1418,24 @@ class Actions:
     def __get__(self, inst, class_):
         if inst is None:
             return self
-        return self.__class__(*[a.__get__(inst) for a in self.actions])
+        # The bound actions are cached on the form; they depend on the
+        # form prefix and on the actions appended since.
+        try:
+            cache = inst.__dict__.setdefault('__formlib_bound_actions__', {})
+        except AttributeError:
+            cache = {}
+        prefix = getattr(inst, 'prefix', None)
+        cached = cache.get(id(self))
+        if (cached is None or cached[0] is not self or cached[1] != prefix
+                or cached[2] != len(self.actions)):
+            bound = self.__class__(*[a.__get__(inst) for a in self.actions])
+            cached = cache[id(self)] = (self, prefix, len(self.actions), bound)
+        return cached[3]
 
 
 def handleSubmit(actions, data, default_validate=None):
     """Handle a submit."""
-    for action in actions:
+    for action in _submitCandidates(actions):
         if action.submitted():
             errors = action.validate(data)
             if errors is None and default_validate is not None:
@@ -758,15 +1447,59 @@ def handleSubmit(actions, data, default_validate=None):
 # TODO need test for this
 
 
+def _submitCandidates(actions):
+    """Return the actions that may have been submitted, in order.
+
+    An action using the default `Action.submitted` can only have been
+    submitted if its name is in the request form.  If all actions do,
+    they are looked up by name, so no other action is asked whether it
+    was submitted and no other action condition is evaluated.
+
+    Actions sharing a name are asked in order, as the lookup by name
+    only knows the last of them.
+    """
+    byname = getattr(actions, 'byname', None)
+    if not byname or len(byname) != len(actions.actions):
+        return actions
+    form = getattr(next(iter(byname.values())), 'form', None)
+    if form is None:
+        # The actions are not bound.
+        return actions
+    for action in byname.values():
+        if getattr(type(action), 'submitted', None) is not Action.submitted:
+            return actions
+
+    request_form = form.request.form
+    if len(request_form) < len(byname):
+        names = [name for name in request_form if name in byname]
+        if len(names) > 1:
+            order = {name: i for i, name in enumerate(byname)}
+            names.sort(key=order.__getitem__)
+    else:
+        names = [name for name in byname if name in request_form]
+    return [byname[name] for name in names]
+
+
 def availableActions(form, actions):
     result = []
     for action in actions:
-        condition = action.condition
-        if (condition is None) or condition(form, action):
+        if getattr(action, 'form', None) is form:
+            # Use the availability remembered by the bound action.
+            available = action.available()
+        else:
+            condition = action.condition
+            available = (condition is None) or condition(form, action)
+        if available:
             result.append(action)
     return result
 
 
+def forgetAvailability(actions):
+    """See `zope.formlib.interfaces.IFormAPI.forgetAvailability`"""
+    for action in actions:
+        getattr(action, '__dict__', {}).pop('_available', None)
+
+
 @interface.implementer(interfaces.IForm)
 class FormBase(zope.publisher.browser.BrowserPage):
 
@@ -776,7 +1509,7 @@ class FormBase(zope.publisher.browser.BrowserPage):
 
     status = ''
 
-    errors = ()
+    errors = FormErrors()
 
     ignoreContext = False
 
@@ -786,6 +1519,14 @@ class FormBase(zope.publisher.browser.BrowserPage):
 
     csrftoken = None
 
+    lazy_widgets = False
+
+    skip_unaffected_invariants = False
+
+    track_changes = False
+
+    fingerprints = None
+
     def setPrefix(self, prefix):
         self.prefix = prefix
 
@@ -824,11 +1565,20 @@ class FormBase(zope.publisher.browser.BrowserPage):
             # form data. This submit is invalid!
             raise InvalidCSRFTokenError(_('Invalid CSRF token'))
 
+    def renderFingerprints(self):
+        """Render the fingerprints of the rendered values, if tracked."""
+        if not self.fingerprints:
+            return ''
+        return '<input type="hidden" name=%s value=%s />' % (
+            _quote(expandPrefix(self.prefix) + '__fingerprints__'),
+            _quote(formatFingerprints(self.fingerprints)))
+
     def setUpWidgets(self, ignore_request=False):
-        self.adapters = {}
+        self.adapters = getSchemaAdapters(self.context, self.request)
         self.widgets = setUpWidgets(
             self.form_fields, self.prefix, self.context, self.request,
-            form=self, adapters=self.adapters, ignore_request=ignore_request)
+            form=self, adapters=self.adapters, ignore_request=ignore_request,
+            lazy=self.lazy_widgets)
 
     def validate(self, action, data):
         if self.method is not None:
@@ -841,8 +1591,14 @@ class FormBase(zope.publisher.browser.BrowserPage):
             context = None
         else:
             context = self.context
-        return (getWidgetsData(self.widgets, self.prefix, data)
-                + checkInvariants(self.form_fields, data, context))
+        adapters = getattr(self, 'adapters', None)
+        skip_unaffected = self.skip_unaffected_invariants
+        instrumentation = _getInstrumentation()
+        return (_timed(instrumentation, self, 'getWidgetsData',
+                       getWidgetsData, self.widgets, self.prefix, data, self)
+                + _timed(instrumentation, self, 'checkInvariants',
+                         checkInvariants, self.form_fields, data, context,
+                         adapters, skip_unaffected))
 
     template = namedtemplate.NamedTemplate('default')
 
@@ -851,7 +1607,9 @@ class FormBase(zope.publisher.browser.BrowserPage):
         return availableActions(self, self.actions)
 
     def resetForm(self):
+        forgetWriteDecisions(self.request)
         self.setUpWidgets(ignore_request=True)
+        forgetAvailability(self.actions)
 
     form_result = None
     form_reset = True
@@ -859,27 +1617,36 @@ class FormBase(zope.publisher.browser.BrowserPage):
     def update(self):
         if self.protected:
             self.setUpToken()  # This form has CSRF protection enabled.
-        self.setUpWidgets()
+        instrumentation = _getInstrumentation()
+        _timed(instrumentation, self, 'setUpWidgets', self.setUpWidgets)
         self.form_reset = False
+        forgetAvailability(self.actions)
 
         data = {}
         errors, action = handleSubmit(self.actions, data, self.validate)
         # the following part will make sure that previous error not
         # get overriden by new errors. This is usefull for subforms. (ri)
         if self.errors is None:
-            self.errors = errors
-        else:
-            if errors is not None:
-                self.errors += tuple(errors)
+            self.errors = FormErrors(errors or ())
+        elif errors is not None:
+            self.errors = FormErrors(self.errors) + errors
+        elif not isinstance(self.errors, FormErrors):
+            self.errors = FormErrors(self.errors)
 
         if errors:
             self.status = _('There were errors')
-            result = action.failure(data, errors)
+            result = _timed(instrumentation, self, 'failure',
+                            action.failure, data, errors)
         elif errors is not None:
             self.form_reset = True
-            result = action.success(data)
+            result = _timed(instrumentation, self, 'success',
+                            action.success, data)
         else:
             result = None
+        if action is not None:
+            # The handler may have changed what is available or writable.
+            forgetAvailability(self.actions)
+            forgetWriteDecisions(self.request)
 
         self.form_result = result
 
@@ -891,10 +1658,32 @@ class FormBase(zope.publisher.browser.BrowserPage):
                 # causes the widgets to have different data
                 self.resetForm()
                 self.form_reset = False
-            self.form_result = self.template()
+            self.form_result = self._renderTemplate(_getInstrumentation())
 
         return self.form_result
 
+    def _renderTemplate(self, instrumentation):
+        widgets = getattr(self, 'widgets', None)
+        if instrumentation is None or not isinstance(widgets, Widgets):
+            return _timed(instrumentation, self, 'render', self.template)
+        self.widgets = _instrumentWidgets(widgets, self, instrumentation)
+        try:
+            return _timed(instrumentation, self, 'render', self.template)
+        finally:
+            self.widgets = widgets
+
+    def renderChunks(self):
+        """Render the default form markup as a list of strings."""
+        if self.form_result is not None:
+            return [self.form_result]
+        if self.form_reset:
+            self.resetForm()
+            self.form_reset = False
+        if interfaces.IPageForm.providedBy(self):
+            head, tail = _renderPage(self)
+            return [head] + list(_renderFormChunks(self, True)) + [tail]
+        return list(_renderFormChunks(self, False))
+
     def __call__(self):
         self.update()
         if self.request.response.getStatus() in [301, 302, 303, 307]:
@@ -905,21 +1694,24 @@ class FormBase(zope.publisher.browser.BrowserPage):
         return result
 
     def error_views(self):
+        # The views are rendered up front so that rendering them is timed.
+        return iter(_timed(_getInstrumentation(), self, 'error_views',
+                           list, self._error_views()))
+
+    def _error_views(self):
         for error in self.errors:
             if isinstance(error, str):
                 yield error
             else:
-                view = component.getMultiAdapter(
-                    (error, self.request),
-                    IWidgetInputErrorView)
+                snippet = errorSnippet(error, self.request)
                 title = getattr(error, 'widget_title', None)  # duck typing
                 if title:
                     if isinstance(title, zope.i18n.Message):
                         title = zope.i18n.translate(
                             title, context=self.request)
-                    yield f'{title}: {view.snippet()}'
+                    yield f'{title}: {snippet}'
                 else:
-                    yield view.snippet()
+                    yield snippet
 
 
 def haveInputWidgets(form, action):
@@ -933,16 +1725,24 @@ def haveInputWidgets(form, action):
 class EditFormBase(FormBase):
 
     def setUpWidgets(self, ignore_request=False):
-        self.adapters = {}
+        self.adapters = getSchemaAdapters(self.context, self.request)
+        if not self.track_changes:
+            self.fingerprints = None
+        elif ignore_request:
+            self.fingerprints = {}
+        else:
+            self.fingerprints = parseFingerprints(self.request.form.get(
+                expandPrefix(self.prefix) + '__fingerprints__'))
         self.widgets = setUpEditWidgets(
             self.form_fields, self.prefix, self.context, self.request,
-            adapters=self.adapters, ignore_request=ignore_request
+            adapters=self.adapters, ignore_request=ignore_request,
+            lazy=self.lazy_widgets, fingerprints=self.fingerprints
         )
 
     @action(_("Apply"), condition=haveInputWidgets)
     def handle_edit_action(self, action, data):
         descriptions = applyData(self.context, self.form_fields, data,
-                                 self.adapters)
+                                 self.adapters, self.fingerprints)
         if descriptions:
             descriptions = [Attributes(interface, *tuple(keys))
                             for interface, keys in descriptions.items()]
@@ -970,11 +1770,11 @@ class EditFormBase(FormBase):
 class DisplayFormBase(FormBase):
 
     def setUpWidgets(self, ignore_request=False):
-        self.adapters = {}
+        self.adapters = getSchemaAdapters(self.context, self.request)
         self.widgets = setUpEditWidgets(
             self.form_fields, self.prefix, self.context, self.request,
             adapters=self.adapters, for_display=True,
-            ignore_request=ignore_request
+            ignore_request=ignore_request, lazy=self.lazy_widgets
         )
 
     actions = ()
@@ -995,7 +1795,7 @@ class AddFormBase(FormBase):
     def setUpWidgets(self, ignore_request=False):
         self.widgets = setUpInputWidgets(
             self.form_fields, self.prefix, self.context, self.request,
-            ignore_request=ignore_request,
+            ignore_request=ignore_request, lazy=self.lazy_widgets,
         )
 
     @action(_("Add"), condition=haveInputWidgets)
@@ -1026,16 +1826,211 @@ class AddFormBase(FormBase):
             return ""
         return super().render()
 
+    def renderChunks(self):
+        if self._finished_add:
+            self.request.response.redirect(self.nextURL())
+            return []
+        return super().renderChunks()
+
     def nextURL(self):
         return self.context.nextURL()
 
 
+def _translate(text, request):
+    # Page templates translate strings in the "default" domain.
+    return zope.i18n.translate(text, 'default', context=request)
+
+
+def _quote(value):
+    return '"%s"' % escape(str(value), False).replace('"', '&quot;')
+
+
+def _renderWidgetRow(widget, request):
+    """Render the table row of `widget` like the form templates."""
+    hint = widget.hint
+    name = _quote(widget.name)
+    if widget.required:
+        label = '<span class="required">*</span>'
+    else:
+        label = ''
+    label += '<span>%s</span>' % escape(
+        _translate(widget.label, request), False)
+    if hint:
+        hint = escape(_translate(hint, request), False)
+        parts = [
+            '<tr>\n<td class="label">\n'
+            '<label onmousedown="toggleFormFieldHelp(this,1)"'
+            ' onmouseup="toggleFormFieldHelp(this,0)"'
+            ' onmouseout="toggleFormFieldHelp(this,0)"'
+            ' style="cursor: help" for=%s>\n%s\n</label>\n</td>\n'
+            '<td class="field">\n'
+            '<div class="form-fields-help"'
+            ' onclick="this.style.visibility=\'hidden\';"'
+            ' style="visibility: hidden; position: absolute;"'
+            ' id="field-help-for-%s">%s</div>\n'
+            % (name, label, name[1:-1], hint)]
+    else:
+        parts = [
+            '<tr>\n<td class="label">\n'
+            '<label for=%s>\n%s\n</label>\n</td>\n'
+            '<td class="field">\n' % (name, label)]
+    parts.append('<div class="widget">')
+    renderInto = getattr(widget, 'renderInto', None)
+    if renderInto is None:
+        parts.append(widget())
+    else:
+        renderInto(parts)
+    parts.append('</div>\n')
+    error = widget.error()
+    if error:
+        parts.append('<div class="error">\n%s\n</div>\n' % error)
+    parts.append('</td>\n</tr>\n')
+    return ''.join(parts)
+
+
+def _renderStatus(form):
+    status = form.status
+    if not status:
+        return ''
+    parts = ['<div class="form-status">\n<div class="summary">%s</div>\n'
+             % escape(_translate(status, form.request), False)]
+    if form.errors:
+        parts.append('<ul class="errors">\n')
+        for error in form.error_views():
+            parts.append('<li>\n%s\n</li>\n' % error)
+        parts.append('</ul>\n')
+    parts.append('</div>\n')
+    return ''.join(parts)
+
+
+def _renderActions(form):
+    parts = []
+    if form.protected:
+        parts.append('<input type="hidden" name="___csrftoken__" value=%s />\n'
+                     % _quote(form.csrftoken))
+    if form.track_changes:
+        parts.append(form.renderFingerprints())
+    for action in form.actions:
+        parts.append(action.render())
+    return '\n'.join(parts)
+
+
+def _renderFormChunks(form, page):
+    """Render the markup of the default form templates in chunks.
+
+    The header, every widget row and the action bar are separate chunks.
+    `page` selects the markup of the page form template over the one of
+    the sub page form template.
+    """
+    request = form.request
+    parts = []
+    if page:
+        parts.append(
+            '<div>\n<form action=%s method="post" class="edit-form"'
+            ' enctype="multipart/form-data" id="zc.page.browser_form">\n'
+            % _quote(request.URL))
+    else:
+        parts.append('<div>\n')
+    parts.append('<script type="text/javascript"'
+                 ' src="++resource++zope.formlib/pageform.js"></script>\n')
+    if page:
+        parts.append('<div id="viewspace">\n')
+    if form.label:
+        parts.append('<h1>%s</h1>\n'
+                     % escape(_translate(form.label, request), False))
+    parts.append(_renderStatus(form))
+    if page:
+        parts.append('<div>\n')
+    parts.append('<table class="form-fields">\n')
+    yield ''.join(parts)
+
+    for widget in form.widgets:
+        yield _renderWidgetRow(widget, request)
+
+    parts = ['</table>\n']
+    if page:
+        parts.append('</div>\n</div>\n<div id="actionsView">\n')
+        if form.availableActions():
+            parts.append('<span class="actionButtons">\n%s\n</span>\n'
+                         % _renderActions(form))
+        parts.append('</div>\n</form>\n')
+    elif form.availableActions():
+        parts.append('<div class="form-controls">\n%s\n</div>\n'
+                     % _renderActions(form))
+    extra_script = getattr(form, 'extra_script', None)
+    if callable(extra_script):
+        extra_script = extra_script()
+    if extra_script:
+        parts.append('<script type="text/javascript">%s</script>\n'
+                     % extra_script)
+    parts.append('</div>')
+    yield ''.join(parts)
+
+
+_page_template = ViewPageTemplateFile('pagewrapper.pt')
+
+_body_marker = '<!-- zope.formlib form body -->'
+
+
+def _renderPage(form):
+    """Return the markup of the page before and after the form."""
+    head, tail = _page_template(form, body=_body_marker).split(
+        _body_marker, 1)
+    return head, tail
+
+
+class _FormRenderer:
+    """Descriptor rendering the default form markup without TAL.
+
+    Unlike the page templates it replaces, the renderer has no macros:
+    templates using ``view/template/macros`` don't work with it.
+    """
+
+    def __init__(self, page):
+        self.page = page
+
+    def __get__(self, form, type=None):
+        if form is None:
+            return self
+        return _BoundFormRenderer(self, form)
+
+    def render(self, form):
+        body = ''.join(_renderFormChunks(form, self.page))
+        if self.page:
+            return _page_template(form, body=body)
+        return body
+
+
+class _BoundFormRenderer:
+    """A `_FormRenderer` bound to a form."""
+
+    def __init__(self, renderer, form):
+        self.renderer = renderer
+        self.form = form
+
+    def __call__(self):
+        return self.renderer.render(self.form)
+
+    @property
+    def macros(self):
+        raise AttributeError(
+            'macros', 'The Python form templates have no macros.  Use the'
+            ' page templates (not pythontemplates.zcml) for forms whose'
+            ' templates use the macros of the default template.')
+
+
 default_page_template = namedtemplate.NamedTemplateImplementation(
     ViewPageTemplateFile('pageform.pt'), interfaces.IPageForm)
 
 default_subpage_template = namedtemplate.NamedTemplateImplementation(
     ViewPageTemplateFile('subpageform.pt'), interfaces.ISubPageForm)
 
+python_page_template = namedtemplate.NamedTemplateImplementation(
+    _FormRenderer(True), interfaces.IPageForm)
+
+python_subpage_template = namedtemplate.NamedTemplateImplementation(
+    _FormRenderer(False), interfaces.ISubPageForm)
+
 
 @interface.implementer(interfaces.IPageForm)
 class PageForm(FormBase):
@@ -300,6 +300,14 @@ class IBrowserWidget(IWidget):
         """Render the validation error for the widget, or return
         an empty string if no error"""
 
+    def renderInto(out):
+        """Render the widget by appending strings to the list `out`.
+
+        ``''.join(out)`` afterwards contains what `__call__` returns.
+        Widgets rendering large amounts of markup use this to avoid
+        building intermediate strings.
+        """
+
 
 class ISimpleInputWidget(IBrowserWidget, IInputWidget):
     """A widget that uses a single HTML element to collect user input."""
@@ -373,6 +381,62 @@ class ISourceQueryView(Interface):
         """
 
 
+class ICacheableVocabulary(Interface):
+    """A vocabulary whose rendered items may be cached
+
+    Items widgets render the options of vocabularies providing this
+    interface once per locale, preferred languages, widget class and CSS
+    class, and reuse them for later renderings.  The terms and their
+    titles must not change, unless the cache version is changed as well.
+
+    Unless a cache key is declared, the renderings are only reused for
+    the same vocabulary object.  Vocabularies that are created anew for
+    every use (like those of vocabulary factories, which are called
+    whenever a field is bound) only benefit from the cache if they
+    declare a cache key.
+    """
+
+    cache_key = Attribute(
+        "cache_key",
+        """Optional hashable identity of the terms
+
+        Vocabularies with the same cache key share their cached
+        renderings, so they must have the same terms.
+        """)
+
+    cache_version = Attribute(
+        "cache_version",
+        """Optional hashable version of the terms
+
+        Changing the version invalidates the cached renderings.
+        """)
+
+
+class IFormInstrumentation(Interface):
+    """Receives timings of form processing
+
+    If a utility providing this interface is registered, forms report
+    how long the phases of processing a request took.  If none is
+    registered, no timings are taken.
+    """
+
+    def record(form, phase, duration, widget=None):
+        """Record the `duration` of a `phase`, in seconds
+
+        The form phases are ``setUpWidgets``, ``getWidgetsData``,
+        ``checkInvariants``, ``success`` and ``failure`` (action
+        handlers), ``render`` (the form template) and ``error_views``.
+
+        Widget phases are ``getInputValue`` (converting and validating
+        the input while the form data are collected) and
+        ``renderWidget`` (rendering the widget in the form template).
+        For these, the widget is passed.
+
+        The form may be None, if widget data are collected outside of
+        a form.
+        """
+
+
 class ISubPage(Interface):
     """A component that computes part of a page
     """
@@ -484,7 +548,7 @@ class IFormAPI(Interface):
         """
 
     def setUpInputWidgets(form_fields, form_prefix, context, request,
-                          ignore_request=False):
+                          ignore_request=False, lazy=False):
         """Set up widgets for input
 
         An IWidgets is returned based on the give form fields.
@@ -502,11 +566,16 @@ class IFormAPI(Interface):
 
         If ignore_request passed a true value, then the widgets will
         not initialize their values from the request.
+
+        If lazy is passed a true value, each widget is only created
+        and initialized when it is first accessed by name or through
+        iteration.
         """
 
     def setUpEditWidgets(form_fields, form_prefix, context, request,
                          adapters=None, for_display=False,
-                         ignore_request=False):
+                         ignore_request=False, lazy=False,
+                         fingerprints=None):
         """Set up widgets for editing or displaying content
 
         An IWidgets is returned based on the give form fields.
@@ -530,6 +599,15 @@ class IFormAPI(Interface):
         If the ignore_request option is passed a true value, then
         widget's rendered data will be set from the context, and user
         inputs will be ignored.
+
+        If the lazy option is passed a true value, each widget is only
+        created and initialized when it is first accessed by name or
+        through iteration.  This avoids reading context data for
+        widgets that are never used.
+
+        If a fingerprints mapping is passed, the fingerprints (see
+        `zope.formlib.form.fingerprint`) of the values read from the
+        context for input widgets are stored in it by form field name.
         """
 
     def setUpDataWidgets(form_fields, form_prefix, context, request, data=(),
@@ -557,7 +635,7 @@ class IFormAPI(Interface):
 
         """
 
-    def getWidgetsData(widgets, form_prefix, data):
+    def getWidgetsData(widgets, form_prefix, data, form=None):
         """Get input data and input errors
 
         A sequence of input errors are returned.  Any data available
@@ -565,9 +643,17 @@ class IFormAPI(Interface):
         argument.  The keys in the output mapping are
         widget/form-field names without the form prefix.
 
+        The form, if passed, is reported to the `IFormInstrumentation`
+        utility, if one is registered.
+
+        The widget reporting an error is recorded, so that
+        `IFormErrors` created from the returned errors are indexed by
+        widget name.
+
         """
 
-    def checkInvariants(form_fields, form_data):
+    def checkInvariants(form_fields, form_data, context, adapters=None,
+                        skip_unaffected=False):
         """Check schema invariants for input data
 
         For each schema that was used to define the form fields and
@@ -575,10 +661,53 @@ class IFormAPI(Interface):
         checked. Invariants that refer to fields not included in the
         form fields are ignored.
 
-        A list of errors is returned.
+        Values not in the form data are looked up on the context
+        adapted to the schema.  If an adapters mapping is passed, it
+        is used as a cache for these adapters.
+
+        If `skip_unaffected` is true, invariants that declare their
+        dependencies with `zope.formlib.form.invariantDependsOn` are only
+        checked if one of the fields they depend on was submitted with a
+        value that differs from the value of the context.  Invariants
+        that don't declare their dependencies are always checked.
+
+        A list of errors is returned.  They are recorded as invariant
+        errors for `IFormErrors` created from them.
         """
 
-    def applyChanges(context, form_fields, data, adapters=None):
+    def canWriteFields(context, fields, request):
+        """Decide whether the given schema fields may be written
+
+        A mapping from field names to booleans is returned.  Fields
+        with a writer method (accessor fields) are writable if the
+        writer may be accessed.  The security checker of the context is
+        looked up once for all fields.
+
+        The decisions are remembered for the context while the
+        request is processed, until `forgetWriteDecisions` is called.
+        Forms use them for fields with the DISPLAY_UNWRITEABLE render
+        context.
+        """
+
+    def forgetWriteDecisions(request):
+        """Forget the write permission decisions remembered for `request`
+
+        Forms call this when permissions may have changed, after an
+        action handler ran and when the form is reset.
+        """
+
+    def getSchemaAdapters(context, request):
+        """Return a mapping for caching schema adapters of the context
+
+        The mapping is stored on the request and shared by all forms
+        for the same context object, so schema adapters are only
+        created once per request.  It can be passed as the adapters
+        argument of setUpWidgets, setUpEditWidgets, checkInvariants
+        and applyChanges.
+        """
+
+    def applyChanges(context, form_fields, data, adapters=None,
+                     fingerprints=None):
         """Apply form data to an object
 
         For each form field that has data, the data are applied to the
@@ -587,6 +716,11 @@ class IFormAPI(Interface):
         as a cache.  Typically, it would be a mapping object populated
         when setUpEditWidgets was called.
 
+        If a fingerprints mapping is passed, data whose fingerprint
+        matches the fingerprint of the value the form was rendered with
+        is considered unchanged, without reading the value from the
+        context.
+
         """
 
     def Action(label, **options):
@@ -703,6 +837,14 @@ class IFormAPI(Interface):
 
         """
 
+    def forgetAvailability(actions):
+        """Forget the remembered availability of bound actions
+
+        Bound actions evaluate their condition once and remember the
+        outcome.  Forms call this when their state changes, for example
+        after an action handler ran or the form was reset.
+        """
+
     FormBase = Attribute("""Base class for creating forms
 
     The FormBase class provides reuasable implementation for creating
@@ -795,6 +937,47 @@ class IFormBaseCustomization(ISubPage, IBrowserPage):
         The errors are returned as an iterable.
         """
 
+    skip_unaffected_invariants = Attribute(
+        """Boolean indicating whether unaffected invariants are skipped
+
+        If true, the default validation passes ``skip_unaffected`` to
+        `IFormAPI.checkInvariants`, so that invariants not affected by the
+        submitted data aren't checked.
+        """)
+
+    track_changes = Attribute(
+        """Boolean indicating whether edit forms track changes
+
+        If true, edit forms record fingerprints of the values they render
+        (`fingerprints`) and round-trip them in a hidden input
+        (`renderFingerprints`).  On submit, values that match their
+        fingerprint aren't read from the context and compared.
+
+        Fingerprints are of the values that were rendered, not of the
+        stored values, so they don't detect conflicting edits: if two
+        people edit the same object at the same time, fields the second
+        one didn't change in the form are left alone, but fields they
+        changed overwrite the first one's changes without a warning.
+        """)
+
+    fingerprints = Attribute(
+        """Mapping of form field names to fingerprints, or None
+        """)
+
+    def renderFingerprints():
+        """Render the fingerprints as a hidden input
+
+        An empty string is returned if there are no fingerprints.
+        """
+
+    def renderChunks():
+        """Render the default form markup as a list of strings
+
+        The markup is the one of the default page or sub page form
+        template.  The header, each widget row and the action bar are
+        separate chunks.
+        """
+
 
 class IFormFields(Interface):
     """A colection of form fields (`IFormField` objects)
@@ -840,10 +1023,14 @@ class IFormFields(Interface):
 
         Return a new `IFormFields` that is a selection from the original
         `IFormFields` that has the named fields in the specified order.
+        Repeated selections of the same names may return the same
+        object.
         """
 
     def omit(*names):
         """Omit fields with given names
+
+        Repeated omissions of the same names may return the same object.
         """
 
 
@@ -1010,6 +1197,30 @@ class IWidgets(Interface):
         """
 
 
+class IFormErrors(Interface):
+    """The errors of a form
+
+    Form errors are tuples of errors (widget input errors, invariant
+    errors and messages) that are also indexed by the widget that
+    reported them and by their kind.  The kinds are ``conversion``,
+    ``validation``, ``invariant``, ``csrf`` and ``other``.
+    """
+
+    def forWidget(name):
+        """Return a tuple of the errors reported by the widget `name`
+
+        `name` is the full name of the widget, including the form prefix.
+        """
+
+    def ofKind(kind):
+        """Return a tuple of the errors of the given kind
+        """
+
+    def __add__(errors):
+        """Return form errors with `errors` appended
+        """
+
+
 class IForm(Interface):
     """Base type for forms
 
@@ -14,20 +14,27 @@
 """Browser widgets for items
 """
 __docformat__ = 'restructuredtext'
+import collections
+import threading
+import weakref
 from xml.sax.saxutils import escape
 
 from zope.browserpage import ViewPageTemplateFile
 from zope.i18n import translate
+from zope.i18n.interfaces import IUserPreferredLanguages
 from zope.schema.interfaces import InvalidValue
 from zope.schema.interfaces import ITitledTokenizedTerm
 
 from zope import component
 from zope.formlib.i18n import _
 from zope.formlib.interfaces import ConversionError
+from zope.formlib.interfaces import ICacheableVocabulary
 from zope.formlib.interfaces import IDisplayWidget
 from zope.formlib.interfaces import IInputWidget
 from zope.formlib.widget import SimpleInputWidget
 from zope.formlib.widget import renderElement
+from zope.formlib.widget import renderElementInto
+from zope.formlib.widget import renderTag
 
 
 # For choices, we want to make the widget a view of the field and vocabulary.
@@ -69,6 +76,129 @@ def ChoiceCollectionInputWidget(field, value_type, request):
                                      IInputWidget)
 
 
+class _Selection:
+    """Selected values supporting fast membership tests.
+
+    Hashable values are looked up in a set.  Unhashable values fall back
+    to comparing with every selected value.
+    """
+
+    def __init__(self, values):
+        self.values = list(values)
+        self.hashable = set()
+        self.unhashable = []
+        for value in self.values:
+            try:
+                self.hashable.add(value)
+            except TypeError:
+                self.unhashable.append(value)
+
+    def __contains__(self, value):
+        try:
+            if value in self.hashable:
+                return True
+        except TypeError:
+            return value in self.values
+        return value in self.unhashable
+
+
+class _LRUCache:
+    """A thread-safe mapping keeping the most recently used entries.
+
+    If `isStale` is given, entries for which it returns true are dropped
+    before the least recently used ones when the cache is full.
+    """
+
+    def __init__(self, size, isStale=None):
+        self.size = size
+        self.isStale = isStale
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.size and self.isStale is not None:
+                stale = [key for key, entry in self.entries.items()
+                         if self.isStale(entry)]
+                for key in stale:
+                    del self.entries[key]
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+def _isStaleItems(entry):
+    """Return whether the vocabulary of cached items is gone."""
+    ref = entry[0]
+    return ref is not None and ref() is None
+
+
+# Rendered items of vocabularies providing `ICacheableVocabulary`.
+_items_cache = _LRUCache(100, _isStaleItems)
+
+
+def clearItemsCache():
+    """Forget the rendered items of all cacheable vocabularies."""
+    _items_cache.clear()
+
+
+try:
+    from zope.testing.cleanup import addCleanUp
+except ImportError:  # pragma: no cover
+    pass
+else:
+    addCleanUp(clearItemsCache)
+
+
+def _localeKey(request):
+    """Return a hashable identification of the locale of `request`.
+
+    This includes the languages the user prefers, as translations are
+    negotiated from them rather than taken from the locale.
+    """
+    locale = getattr(request, 'locale', None)
+    identity = getattr(locale, 'id', None)
+    if identity is not None:
+        identity = (identity.language, identity.script, identity.territory,
+                    identity.variant)
+    languages = IUserPreferredLanguages(request, None)
+    if languages is not None:
+        languages = tuple(languages.getPreferredLanguages())
+    return identity, languages
+
+
+def _vocabularyKey(vocabulary):
+    """Return the key and reference for caching items of `vocabulary`.
+
+    Vocabularies declaring a `cache_key` share their cached items with
+    other vocabularies declaring the same key, and the reference is None.
+    Otherwise the items are cached for the vocabulary object only, which
+    is weakly referenced, so that a vocabulary and its context aren't
+    kept alive by the cache.  (None, None) is returned if the items
+    can't be cached.
+    """
+    key = getattr(vocabulary, 'cache_key', None)
+    if key is not None:
+        return ('key', key), None
+    try:
+        ref = weakref.ref(vocabulary)
+    except TypeError:
+        return None, None
+    return ('id', id(vocabulary)), ref
+
+
 class TranslationHook:
     """A mixin class that provides the translation capabilities."""
 
@@ -338,13 +468,46 @@ class ItemsEditWidgetBase(SingleDataHelper, ItemsWidgetBase):
 
     def __call__(self):
         """See IBrowserWidget."""
-        value = self._getFormValue()
-        contents = []
+        out = []
+        self._renderInto(out)
+        return ''.join(out)
 
-        contents.append(self._div('value', self.renderValue(value)))
-        contents.append(self._emptyMarker())
+    def renderInto(self, out):
+        """See IBrowserWidget."""
+        if type(self).__call__ is ItemsEditWidgetBase.__call__:
+            self._renderInto(out)
+        else:
+            out.append(self())
 
-        return self._div(self.cssClass, "\n".join(contents))
+    def _renderInto(self, out):
+        value = self._getFormValue()
+        out.append(renderTag('div', cssClass=self.cssClass) + '>\n')
+        start = len(out)
+        out.append(renderTag('div', cssClass='value') + '>\n')
+        mark = len(out)
+        self.renderValueInto(out, value)
+        if any(out[mark:]):
+            out.append('\n</div>\n')
+        else:
+            # Like `_div`, don't render an empty value div.
+            del out[start:]
+            out.append('\n')
+        out.append(self._emptyMarker())
+        out.append('\n</div>')
+
+    def renderValueInto(self, out, value):
+        """Append the rendered `value` to the list `out`."""
+        out.append(self.renderValue(value))
+
+    def _renderItemsInto(self, out, value, separator):
+        """Append the rendered items separated by `separator` to `out`."""
+        first = True
+        for item in self.renderItems(value):
+            if first:
+                first = False
+            else:
+                out.append(separator)
+            out.append(item)
 
     def _div(self, cssClass, contents, **kw):
         """Render a simple div tag."""
@@ -360,6 +523,7 @@ class ItemsEditWidgetBase(SingleDataHelper, ItemsWidgetBase):
         `values` being marked as selected."""
 
         cssClass = self.cssClass
+        values = _Selection(values)
 
         # multiple items with the same value are not allowed from a
         # vocabulary, so that need not be considered here
@@ -390,6 +554,12 @@ class ItemsEditWidgetBase(SingleDataHelper, ItemsWidgetBase):
             count += 1
 
         # Render normal values
+        if ICacheableVocabulary.providedBy(self.vocabulary):
+            cached_items = self._renderCachedItems(values, count, cssClass)
+            if cached_items is not None:
+                rendered_items.extend(cached_items)
+                return rendered_items
+
         for term in self.vocabulary:
             item_text = self.textForValue(term)
 
@@ -409,6 +579,43 @@ class ItemsEditWidgetBase(SingleDataHelper, ItemsWidgetBase):
 
         return rendered_items
 
+    def _renderCachedItems(self, values, start, cssClass):
+        """Render the vocabulary items, reusing cached renderings.
+
+        The unselected items are rendered once and cached; only the
+        selected items are rendered every time.  None is returned if the
+        vocabulary can't be cached (see `_vocabularyKey`).
+        """
+        vocabulary = self.vocabulary
+        vocabulary_key, ref = _vocabularyKey(vocabulary)
+        if vocabulary_key is None:
+            return None
+        if type(self).renderItem is ItemsEditWidgetBase.renderItem:
+            # Options don't depend on the widget name or their position.
+            placement = None
+        else:
+            placement = self.name, start
+        key = (vocabulary_key, getattr(vocabulary, 'cache_version', None),
+               _localeKey(self.request), type(self), cssClass, placement)
+        entry = _items_cache.get(key)
+        if entry is None or (ref is not None and entry[0]() is not vocabulary):
+            terms = [(term.value, term.token, self.textForValue(term))
+                     for term in vocabulary]
+            rendered = [
+                self.renderItem(start + i, text, token, self.name, cssClass)
+                for i, (value, token, text) in enumerate(terms)]
+            # The reference tells whether the id was reused.
+            entry = (ref, terms, rendered)
+            _items_cache.set(key, entry)
+
+        ref, terms, rendered = entry
+        rendered_items = list(rendered)
+        for i, (value, token, text) in enumerate(terms):
+            if value in values:
+                rendered_items[i] = self.renderSelectedItem(
+                    start + i, text, token, self.name, cssClass)
+        return rendered_items
+
     def renderItem(self, index, text, value, name, cssClass):
         """Render an item for a particular `value`."""
         return renderElement('option',
@@ -441,6 +648,21 @@ class SelectWidget(ItemsEditWidgetBase):
                              size=self.size,
                              extra=self.extra)
 
+    def renderValueInto(self, out, value):
+        if type(self).renderValue is not SelectWidget.renderValue:
+            return super().renderValueInto(out, value)
+
+        def contents(out):
+            out.append('\n')
+            self._renderItemsInto(out, value, '\n')
+            out.append('\n')
+        renderElementInto(out, 'select',
+                          name=self.name,
+                          id=self.name,
+                          contents=contents,
+                          size=self.size,
+                          extra=self.extra)
+
     def renderItems(self, value):
         return self.renderItemsWithValues([value])
 
@@ -494,6 +716,14 @@ class RadioWidget(SelectWidget):
         else:
             return "<br />".join(rendered_items)
 
+    def renderValueInto(self, out, value):
+        if type(self).renderValue is not RadioWidget.renderValue:
+            return super().renderValueInto(out, value)
+        if self.orientation == 'horizontal':
+            self._renderItemsInto(out, value, "&nbsp;&nbsp;")
+        else:
+            self._renderItemsInto(out, value, "<br />")
+
 
 class ItemsMultiEditWidgetBase(MultiDataHelper, ItemsEditWidgetBase):
     """Items widget supporting multiple selections."""
@@ -521,6 +751,18 @@ class ItemsMultiEditWidgetBase(MultiDataHelper, ItemsEditWidgetBase):
                              contents="\n".join(rendered_items),
                              extra=self.extra)
 
+    def renderValueInto(self, out, value):
+        if type(self).renderValue is not ItemsMultiEditWidgetBase.renderValue:
+            return super().renderValueInto(out, value)
+        renderElementInto(out, self.tag,
+                          name=self.name + ':list',
+                          id=self.name,
+                          multiple='multiple',
+                          size=self.size,
+                          contents=lambda out: self._renderItemsInto(
+                              out, value, '\n'),
+                          extra=self.extra)
+
     def hidden(self):
         items = []
         for item in self._getFormValue():
@@ -571,6 +813,7 @@ class OrderedMultiSelectWidget(ItemsMultiEditWidgetBase):
             available_values = self.context.get(self.context.context)
         else:
             available_values = []
+        available_values = _Selection(available_values)
         return [{'text': self.textForValue(term), 'value': term.token}
                 for term in self.vocabulary
                 if term.value not in available_values]
@@ -609,6 +852,14 @@ class MultiCheckBoxWidget(ItemsMultiEditWidgetBase):
         else:
             return "<br />".join(rendered_items)
 
+    def renderValueInto(self, out, value):
+        if type(self).renderValue is not MultiCheckBoxWidget.renderValue:
+            return super().renderValueInto(out, value)
+        if self.orientation == 'horizontal':
+            self._renderItemsInto(out, value, "&nbsp;&nbsp;")
+        else:
+            self._renderItemsInto(out, value, "<br />")
+
     def renderItem(self, index, text, value, name, cssClass):
         """Render an item of the list."""
         return self._renderItem(index, text, value, name, cssClass)
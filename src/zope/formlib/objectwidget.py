@@ -19,13 +19,12 @@ from zope.browserpage import ViewPageTemplateFile
 from zope.interface import implementer
 from zope.schema import getFieldNamesInOrder
 
-from zope import component
 from zope.formlib.interfaces import IInputWidget
-from zope.formlib.interfaces import IWidgetInputErrorView
 from zope.formlib.utility import applyWidgetsChanges
 from zope.formlib.utility import setUpWidgets
 from zope.formlib.widget import BrowserWidget
 from zope.formlib.widget import InputWidget
+from zope.formlib.widget import errorSnippet
 
 
 class ObjectWidgetView:
@@ -111,9 +110,8 @@ class ObjectWidget(BrowserWidget, InputWidget):
             keys = sorted(self._error.keys())
             for key in keys:
                 errormessages.append(str(key) + ': ')
-                errormessages.append(component.getMultiAdapter(
-                    (self._error[key], self.request),
-                    IWidgetInputErrorView).snippet())
+                errormessages.append(
+                    errorSnippet(self._error[key], self.request))
                 errormessages.append(str(key) + ', ')
             return ''.join(errormessages[0:-1])
         return ""
@@ -33,11 +33,11 @@ from zope.formlib.i18n import _
 from zope.formlib.interfaces import IDisplayWidget
 from zope.formlib.interfaces import IInputWidget
 from zope.formlib.interfaces import ISourceQueryView
-from zope.formlib.interfaces import IWidgetInputErrorView
 from zope.formlib.interfaces import MissingInputError
 from zope.formlib.interfaces import WidgetInputError
 from zope.formlib.widget import DisplayWidget
 from zope.formlib.widget import InputWidget
+from zope.formlib.widget import errorSnippet
 from zope.formlib.widgets import MultiCheckBoxWidget
 from zope.formlib.widgets import MultiSelectFrozenSetWidget
 from zope.formlib.widgets import MultiSelectSetWidget
@@ -198,8 +198,7 @@ class SourceInputWidget(InputWidget):
     def error(self):
         if self._error:
             # TODO This code path is untested.
-            return getMultiAdapter((self._error, self.request),
-                                   IWidgetInputErrorView).snippet()
+            return errorSnippet(self._error, self.request)
         return ""
 
     def __call__(self):
@@ -0,0 +1,486 @@
+##############################################################################
+#
+# Copyright (c) 2026 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Micro-benchmarks for formlib hot paths.
+
+Run with::
+
+    python -m zope.formlib.tests.benchmark
+
+Results can be saved as JSON and compared against an earlier run::
+
+    python -m zope.formlib.tests.benchmark --json baseline.json
+    python -m zope.formlib.tests.benchmark --compare baseline.json
+
+When comparing, the exit status is 1 if any timing got slower than the
+baseline by more than the threshold (10% by default).
+
+This module is not collected by the test runner.
+"""
+import argparse
+import functools
+import json
+import os
+import platform
+import sys
+import timeit
+
+import zope.component.testing
+import zope.interface
+import zope.schema
+from zope.browserpage import ViewPageTemplateFile
+from zope.configuration import xmlconfig
+from zope.publisher.browser import TestRequest
+from zope.security.checker import Checker
+from zope.security.checker import CheckerPublic
+from zope.security.checker import defineChecker
+
+import zope.formlib.tests
+from zope.formlib import form
+
+
+def setUp():
+    import zope.traversing.testing
+    from zope.traversing.interfaces import ITraversable
+    from zope.traversing.namespace import view
+    zope.component.testing.setUp()
+    zope.traversing.testing.setUp()
+    zope.component.provideAdapter(
+        view, (None, None), ITraversable, name='view')
+    xmlconfig.file('registerWidgets.zcml', zope.formlib.tests)
+
+
+def tearDown():
+    zope.component.testing.tearDown()
+
+
+def makeSchema(n):
+    """Create a schema with `n` text line fields."""
+    attrs = {'field%d' % i: zope.schema.TextLine(title='Field %d' % i)
+             for i in range(n)}
+    return zope.interface.interface.InterfaceClass(
+        'ISchema%d' % n, (zope.interface.Interface,), attrs,
+        __module__=__name__)
+
+
+def makeContent(schema):
+    @zope.interface.implementer(schema)
+    class Content:
+        pass
+    names = dict.fromkeys(schema, CheckerPublic)
+    defineChecker(Content, Checker(names, names))
+    content = Content()
+    for name in schema:
+        setattr(content, name, 'value of %s' % name)
+    return content
+
+
+def best(func, number, repeat=5):
+    """Return the best time per call of `func` in microseconds."""
+    timer = timeit.Timer(func)
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def bench_setUpEditWidgets(n=60, number=200):
+    """Widget setup with a compiled form plan versus a cold one."""
+    schema = makeSchema(n)
+    form_fields = form.FormFields(schema)
+    context = makeContent(schema)
+    request = TestRequest()
+
+    def warm():
+        form.setUpEditWidgets(form_fields, 'form', context, request)
+
+    def cold():
+        form_fields.__FormFields_plans__.clear()
+        form.setUpEditWidgets(form_fields, 'form', context, request)
+
+    return {'cold plan': best(cold, number), 'warm plan': best(warm, number)}
+
+
+def bench_deriveFormFields(n=60, number=2000):
+    """Deriving form field subsets, rebuilt versus shared."""
+    form_fields = form.FormFields(makeSchema(n))
+    names = tuple('field%d' % i for i in range(0, n, 2))
+
+    def rebuilt():
+        form.FormFields(*[form_fields[name] for name in names])
+        form.FormFields(*[ff for ff in form_fields
+                          if ff.__name__ not in names])
+
+    def shared():
+        form_fields.select(*names)
+        form_fields.omit(*names)
+
+    return {'rebuilt': best(rebuilt, number), 'shared': best(shared, number)}
+
+
+def bench_renderItems(sizes=(1000, 4000), selections=(10, 1000),
+                      number=5):
+    """Rendering items widgets by vocabulary size and selection size."""
+    from zope.schema.vocabulary import SimpleVocabulary
+
+    from zope.formlib.interfaces import ICacheableVocabulary
+    from zope.formlib.itemswidgets import MultiCheckBoxWidget
+    from zope.formlib.itemswidgets import MultiSelectWidget
+    from zope.formlib.itemswidgets import RadioWidget
+    from zope.formlib.itemswidgets import SelectWidget
+    request = TestRequest()
+    results = {}
+    for n in sizes:
+        vocabulary = SimpleVocabulary.fromValues(range(n))
+        choice = zope.schema.Choice(__name__='choice', vocabulary=vocabulary)
+        multi = zope.schema.List(__name__='multi', value_type=choice)
+        for widget_class, field, multiple in (
+                (SelectWidget, choice, False),
+                (RadioWidget, choice, False),
+                (MultiSelectWidget, multi, True),
+                (MultiCheckBoxWidget, multi, True)):
+            widget = widget_class(field.bind(object()), vocabulary, request)
+            for k in (selections if multiple else (1,)):
+                value = list(range(0, n, max(n // k, 1)))[:k]
+                if not multiple:
+                    value = value[0]
+                label = '%s n=%d k=%d' % (widget_class.__name__, n, k)
+                results[label] = best(
+                    functools.partial(widget.renderItems, value), number)
+
+        cacheable = SimpleVocabulary.fromValues(range(n))
+        zope.interface.alsoProvides(cacheable, ICacheableVocabulary)
+        widget = SelectWidget(choice.bind(object()), cacheable, request)
+        results['SelectWidget (cached) n=%d k=1' % n] = best(
+            functools.partial(widget.renderItems, 0), number)
+    return results
+
+
+class BenchEditForm(form.PageEditForm):
+    """An edit form rendered without the site macros of `pageform.pt`."""
+
+    template = ViewPageTemplateFile(
+        'subpageform.pt', os.path.dirname(form.__file__))
+
+
+def bench_pageEditForm(sizes=(10, 50), number=50):
+    """Setting up, submitting and rendering a page edit form."""
+    results = {}
+    for n in sizes:
+        schema = makeSchema(n)
+        context = makeContent(schema)
+        submitted = {'form.field%d' % i: 'new value %d' % i
+                     for i in range(n)}
+        submitted['form.actions.apply'] = 'Apply'
+
+        class EditForm(BenchEditForm):
+            form_fields = form.FormFields(schema)
+
+        def setup():
+            EditForm(context, TestRequest()).update()
+
+        def submit():
+            EditForm(context, TestRequest(form=submitted)).update()
+
+        def render():
+            EditForm(context, TestRequest())()
+
+        results['setup n=%d' % n] = best(setup, number)
+        results['submit n=%d' % n] = best(submit, number)
+        results['render n=%d' % n] = best(render, number)
+    return results
+
+
+def provideStandardMacros():
+    """Provide a minimal ``standard_macros`` view for page forms."""
+    from zope.pagetemplate.pagetemplate import PageTemplate
+    template = PageTemplate()
+    template.write('<html metal:define-macro="view">\n'
+                   '<body metal:define-slot="body" />\n'
+                   '</html>\n')
+
+    @zope.component.adapter(None, None)
+    class StandardMacros:
+        def __init__(self, context, request):
+            pass
+
+        def __getitem__(self, name):
+            return template.macros[name]
+
+    zope.component.provideAdapter(
+        StandardMacros, provides=zope.interface.Interface,
+        name='standard_macros')
+
+
+def bench_formTemplates(sizes=(10, 50), number=50):
+    """Rendering forms with the page templates and the Python templates."""
+    provideStandardMacros()
+    templates = (
+        ('TAL', form.default_page_template, form.default_subpage_template),
+        ('Python', form.python_page_template, form.python_subpage_template),
+    )
+    results = {}
+    try:
+        for n in sizes:
+            schema = makeSchema(n)
+            context = makeContent(schema)
+            for base in (form.PageEditForm, form.SubPageEditForm):
+
+                class EditForm(base):
+                    form_fields = form.FormFields(schema)
+
+                def render():
+                    EditForm(context, TestRequest())()
+
+                for label, page, subpage in templates:
+                    zope.component.provideAdapter(page, name='default')
+                    zope.component.provideAdapter(subpage, name='default')
+                    results['%s %s n=%d' % (base.__name__, label, n)] = best(
+                        render, number)
+    finally:
+        zope.component.provideAdapter(
+            form.default_page_template, name='default')
+        zope.component.provideAdapter(
+            form.default_subpage_template, name='default')
+    return results
+
+
+def bench_sequenceWidget(sizes=(10, 100), number=20):
+    """Rendering and reading a list widget with `k` items."""
+    from zope.formlib.widgets import ListSequenceWidget
+    results = {}
+    for k in sizes:
+        field = zope.schema.List(
+            __name__='items', value_type=zope.schema.TextLine())
+        field = field.bind(object())
+        value = ['item %d' % i for i in range(k)]
+        submitted = {'field.items.%d.' % i: item
+                     for i, item in enumerate(value)}
+        submitted['field.items.count'] = str(k)
+
+        def render():
+            widget = ListSequenceWidget(
+                field, field.value_type, TestRequest())
+            widget.setRenderedValue(value)
+            widget()
+
+        def read():
+            widget = ListSequenceWidget(
+                field, field.value_type, TestRequest(form=submitted))
+            widget.getInputValue()
+
+        results['render k=%d' % k] = best(render, number)
+        results['input k=%d' % k] = best(read, number)
+    return results
+
+
+class ObjectStorage:
+    """Value created by the object widgets."""
+
+
+def makeNestedSchema(depth):
+    """Create a schema nesting object fields `depth` levels deep."""
+    schema = zope.interface.interface.InterfaceClass(
+        'INested0', (zope.interface.Interface,),
+        {'name': zope.schema.TextLine(title='Name')}, __module__=__name__)
+    for d in range(1, depth + 1):
+        schema = zope.interface.interface.InterfaceClass(
+            'INested%d' % d, (zope.interface.Interface,),
+            {'name': zope.schema.TextLine(title='Name'),
+             'child': zope.schema.Object(schema, title='Child')},
+            __module__=__name__)
+    return schema
+
+
+def bench_objectWidget(depths=(1, 5), number=50):
+    """Rendering object widgets nested `d` levels deep."""
+    from zope.publisher.interfaces.browser import IBrowserRequest
+    from zope.schema.interfaces import IObject
+
+    from zope.formlib.interfaces import IInputWidget
+    from zope.formlib.widgets import ObjectWidget
+
+    def objectWidget(field, request):
+        return ObjectWidget(field, request, ObjectStorage)
+
+    zope.component.provideAdapter(
+        objectWidget, (IObject, IBrowserRequest), IInputWidget)
+    results = {}
+    for d in depths:
+        field = zope.schema.Object(makeNestedSchema(d), __name__='top')
+
+        def render():
+            objectWidget(field, TestRequest())()
+
+        results['render d=%d' % d] = best(render, number)
+    return results
+
+
+def bench_sourceQuery(sizes=(100, 10000), number=20):
+    """Rendering a source widget with the results of a query."""
+    from zope.browser.interfaces import ITerms
+    from zope.publisher.interfaces.browser import IBrowserRequest
+    from zope.schema.interfaces import ISource
+    from zope.schema.vocabulary import SimpleTerm
+
+    from zope.formlib.interfaces import ISourceQueryView
+    from zope.formlib.source import SourceInputWidget
+
+    @zope.interface.implementer(ISource)
+    class Source(list):
+        pass
+
+    @zope.interface.implementer(ITerms)
+    class Terms:
+
+        def __init__(self, source, request):
+            pass
+
+        def getTerm(self, value):
+            return SimpleTerm(value, token=value, title=value)
+
+        def getValue(self, token):
+            return token
+
+    @zope.interface.implementer(ISourceQueryView)
+    class QueryView:
+
+        def __init__(self, source, request):
+            self.source = source
+            self.request = request
+
+        def render(self, name):
+            return ('<input name="%s.string">\n'
+                    '<input type="submit" name="%s" value="Search">'
+                    % (name, name))
+
+        def results(self, name):
+            if name in self.request:
+                string = self.request.get(name + '.string')
+                return [value for value in self.source if string in value]
+            return None
+
+    zope.component.provideAdapter(Terms, (Source, IBrowserRequest))
+    zope.component.provideAdapter(
+        QueryView, (Source, IBrowserRequest), ISourceQueryView)
+    query = {'field.value.query': 'Search',
+             'field.value.query.string': '7'}
+    results = {}
+    for n in sizes:
+        field = zope.schema.Choice(
+            __name__='value',
+            source=Source('value %d' % i for i in range(n)))
+
+        def render():
+            SourceInputWidget(field, field.source, TestRequest(form=query))()
+
+        results['query n=%d' % n] = best(render, number)
+    return results
+
+
+def bench_renderElement(number=20000):
+    """Raw tag rendering throughput."""
+    from zope.formlib.widget import renderElement
+    return {
+        'input': best(functools.partial(
+            renderElement, 'input', type='text', name='field.title',
+            id='field.title', value='A title', cssClass='textType',
+            size=20, extra=''), number),
+        'option': best(functools.partial(
+            renderElement, 'option', contents='A title', value='a-token',
+            selected='selected'), number),
+    }
+
+
+BENCHMARKS = (
+    bench_setUpEditWidgets,
+    bench_deriveFormFields,
+    bench_renderItems,
+    bench_pageEditForm,
+    bench_formTemplates,
+    bench_sequenceWidget,
+    bench_objectWidget,
+    bench_sourceQuery,
+    bench_renderElement,
+)
+
+
+def run(names=None):
+    """Run the benchmarks and return a mapping of labels to timings."""
+    results = {}
+    setUp()
+    try:
+        for bench in BENCHMARKS:
+            if names and bench.__name__ not in names:
+                continue
+            print(bench.__name__)
+            for label, usec in bench().items():
+                print(f'    {label:<36} {usec:12.1f} usec')
+                results[f'{bench.__name__}: {label}'] = usec
+    finally:
+        tearDown()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print how `results` compare to `baseline`.
+
+    Return the labels of the timings slower than the baseline by more
+    than `threshold`.
+    """
+    regressions = []
+    print()
+    print('Compared to baseline')
+    for label, usec in results.items():
+        base = baseline.get(label)
+        if not base:
+            continue
+        ratio = usec / base
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  REGRESSION'
+            regressions.append(label)
+        print(f'    {label:<60} {ratio:6.2f}x{flag}')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Time the zope.formlib hot paths.')
+    parser.add_argument(
+        'names', nargs='*', metavar='BENCHMARK',
+        help='only run these benchmarks, e.g. bench_renderItems')
+    parser.add_argument(
+        '--json', metavar='FILE',
+        help='write the results as JSON to FILE')
+    parser.add_argument(
+        '--compare', metavar='BASELINE',
+        help='compare against the JSON results in BASELINE')
+    parser.add_argument(
+        '--threshold', type=float, default=0.1,
+        help='relative slowdown reported as a regression (default: 0.1)')
+    options = parser.parse_args(argv)
+
+    results = run(options.names)
+    if options.json:
+        with open(options.json, 'w') as f:
+            json.dump({'python': platform.python_version(),
+                       'implementation': platform.python_implementation(),
+                       'results': results}, f, indent=2, sort_keys=True)
+    if options.compare:
+        with open(options.compare) as f:
+            baseline = json.load(f)['results']
+        if compare(results, baseline, options.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -15,6 +15,9 @@
 """
 import unittest
 
+from zope.component.testing import PlacelessSetup
+from zope.security.checker import Checker
+
 
 class FormBaseTests(unittest.TestCase):
 
@@ -49,7 +52,1746 @@ class FormBaseTests(unittest.TestCase):
             self.assertEqual(form(), '')
 
 
+class FormFieldsTests(unittest.TestCase):
+
+    def _makeFormFields(self):
+        from zope.interface import Interface
+        from zope.schema import TextLine
+
+        from zope.formlib.form import FormFields
+
+        class ISchema(Interface):
+            title = TextLine()
+            description = TextLine()
+            body = TextLine()
+
+        return FormFields(ISchema)
+
+    def test_select(self):
+        form_fields = self._makeFormFields()
+        selected = form_fields.select('body', 'title')
+        self.assertEqual([ff.__name__ for ff in selected], ['body', 'title'])
+        self.assertIs(selected['title'], form_fields['title'])
+        self.assertIs(form_fields.select('body', 'title'), selected)
+        self.assertIsNot(form_fields.select('title', 'body'), selected)
+        self.assertRaises(KeyError, form_fields.select, 'missing')
+        self.assertRaises(ValueError, form_fields.select, 'body', 'body')
+
+    def test_omit(self):
+        form_fields = self._makeFormFields()
+        omitted = form_fields.omit('description')
+        self.assertEqual([ff.__name__ for ff in omitted], ['title', 'body'])
+        self.assertIs(omitted['body'], form_fields['body'])
+        self.assertIsNone(omitted.get('description'))
+        self.assertIs(form_fields.omit('description'), omitted)
+        self.assertEqual(len(form_fields.omit('missing')), 3)
+
+    def test_add(self):
+        form_fields = self._makeFormFields()
+        added = form_fields.select('body') + form_fields.omit('body')
+        self.assertEqual([ff.__name__ for ff in added],
+                         ['body', 'title', 'description'])
+        self.assertIs(added['title'], form_fields['title'])
+        self.assertRaises(ValueError, form_fields.__add__,
+                          form_fields.select('body'))
+        self.assertIs(form_fields.__add__(()), NotImplemented)
+
+    def test_derived_instances_keep_class(self):
+        from zope.formlib.form import FormFields
+
+        class MyFormFields(FormFields):
+            pass
+
+        form_fields = MyFormFields(*self._makeFormFields())
+        self.assertIsInstance(form_fields.select('title'), MyFormFields)
+        self.assertIsInstance(form_fields.omit('title'), MyFormFields)
+        self.assertIsInstance(
+            form_fields.select('title') + form_fields.omit('title'),
+            MyFormFields)
+
+
+class FormPlanTests(unittest.TestCase):
+
+    def _makeFormFields(self):
+        from zope.interface import Interface
+        from zope.schema import TextLine
+
+        from zope.formlib.form import FormField
+        from zope.formlib.form import FormFields
+        from zope.formlib.interfaces import DISPLAY_UNWRITEABLE
+
+        class ISchema(Interface):
+            title = TextLine()
+            identifier = TextLine(readonly=True)
+            body = TextLine()
+
+        return FormFields(
+            ISchema['title'],
+            FormField(ISchema['identifier'], prefix='meta'),
+            FormField(ISchema['body'], render_context=DISPLAY_UNWRITEABLE))
+
+    def test_plan_is_cached_per_prefix(self):
+        from zope.formlib.form import getFormPlan
+        form_fields = self._makeFormFields()
+        plan = getFormPlan(form_fields, 'form')
+        self.assertIs(getFormPlan(form_fields, 'form'), plan)
+        self.assertIsNot(getFormPlan(form_fields, 'other'), plan)
+
+    def test_plan_for_sequences_is_not_cached(self):
+        from zope.formlib.form import getFormPlan
+        form_fields = list(self._makeFormFields())
+        plan = getFormPlan(form_fields, 'form')
+        self.assertIsNot(getFormPlan(form_fields, 'form'), plan)
+        self.assertEqual(len(plan.fields), 3)
+
+    def test_plan_contents(self):
+        from zope.formlib.form import getFormPlan
+        form_fields = self._makeFormFields()
+        title, identifier, body = getFormPlan(form_fields, 'form')
+        self.assertEqual(
+            [p.widget_prefix for p in (title, identifier, body)],
+            ['form', 'form.meta', 'form'])
+        self.assertEqual(
+            [p.readonly for p in (title, identifier, body)],
+            [False, True, False])
+        self.assertEqual(
+            [p.check_writable for p in (title, identifier, body)],
+            [False, False, True])
+        self.assertIs(title.form_field, form_fields['title'])
+
+    def test_plan_follows_changed_form_fields(self):
+        from zope.formlib.form import getFormPlan
+        from zope.formlib.interfaces import DISPLAY_UNWRITEABLE
+        form_fields = self._makeFormFields()
+        plan = getFormPlan(form_fields, 'form')
+        self.assertIs(getFormPlan(form_fields, 'form'), plan)
+        form_fields['title'].for_display = True
+        title = getFormPlan(form_fields, 'form').fields[0]
+        self.assertTrue(title.readonly)
+        form_fields['title'].render_context = DISPLAY_UNWRITEABLE
+        title = getFormPlan(form_fields, 'form').fields[0]
+        self.assertTrue(title.check_writable)
+        form_fields['title'].prefix = 'meta'
+        title = getFormPlan(form_fields, 'form').fields[0]
+        self.assertEqual(title.widget_prefix, 'form.meta')
+        plan = getFormPlan(form_fields, 'form')
+        self.assertIs(getFormPlan(form_fields, 'form'), plan)
+
+
+def _provideTextWidgets():
+    from zope.component import provideAdapter
+    from zope.publisher.interfaces.browser import IBrowserRequest
+    from zope.schema.interfaces import ITextLine
+
+    from zope.formlib.interfaces import IDisplayWidget
+    from zope.formlib.interfaces import IInputWidget
+    from zope.formlib.widgets import TextWidget
+    from zope.formlib.widgets import UnicodeDisplayWidget
+    provideAdapter(TextWidget, (ITextLine, IBrowserRequest),
+                   IInputWidget)
+    provideAdapter(UnicodeDisplayWidget, (ITextLine, IBrowserRequest),
+                   IDisplayWidget)
+
+
+class LazyWidgetsTests(PlacelessSetup, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        _provideTextWidgets()
+
+    def _makeContent(self):
+        from zope.interface import Interface
+        from zope.interface import implementer
+        from zope.schema import TextLine
+
+        class ISchema(Interface):
+            title = TextLine()
+            identifier = TextLine(readonly=True)
+            body = TextLine()
+
+        reads = []
+
+        @implementer(ISchema)
+        class Content:
+            def __getattr__(self, name):
+                if name.startswith('__'):
+                    raise AttributeError(name)
+                reads.append(name)
+                return name.upper()
+
+        return ISchema, Content(), reads
+
+    def _makeRequest(self, **kw):
+        from zope.publisher.browser import TestRequest
+        return TestRequest(**kw)
+
+    def test_widgets_are_set_up_on_access(self):
+        from zope.formlib.form import FormFields
+        from zope.formlib.form import LazyWidgets
+        from zope.formlib.form import setUpEditWidgets
+        schema, content, reads = self._makeContent()
+        widgets = setUpEditWidgets(FormFields(schema), 'form', content,
+                                   self._makeRequest(), lazy=True)
+        self.assertIsInstance(widgets, LazyWidgets)
+        self.assertEqual(reads, [])
+        self.assertEqual(widgets['body'].name, 'form.body')
+        self.assertEqual(reads, ['body'])
+        self.assertIs(widgets.get('body'), widgets['body'])
+        self.assertIsNone(widgets.get('missing'))
+        self.assertEqual(reads, ['body'])
+
+    def test_iteration(self):
+        from zope.formlib.form import FormFields
+        from zope.formlib.form import setUpEditWidgets
+        schema, content, reads = self._makeContent()
+        widgets = setUpEditWidgets(FormFields(schema), 'form', content,
+                                   self._makeRequest(), lazy=True)
+        self.assertEqual([w.name for w in widgets],
+                         ['form.title', 'form.identifier', 'form.body'])
+        self.assertEqual(
+            [input for input, w in widgets.__iter_input_and_widget__()],
+            [True, False, True])
+        self.assertEqual(reads, ['title', 'identifier', 'body'])
+
+    def test_add(self):
+        from zope.formlib.form import FormFields
+        from zope.formlib.form import setUpEditWidgets
+        schema, content, reads = self._makeContent()
+        request = self._makeRequest()
+        widgets = setUpEditWidgets(FormFields(schema).select('title'),
+                                   'form', content, request, lazy=True)
+        other = setUpEditWidgets(FormFields(schema).select('body'),
+                                 'form', content, request)
+        for combined in (widgets + other, other + widgets):
+            self.assertEqual(sorted(w.name for w in combined),
+                             ['form.body', 'form.title'])
+            self.assertEqual(combined['title'].name, 'form.title')
+
+    def test_widget_names_are_checked(self):
+        from zope.formlib.form import FormFields
+        from zope.formlib.form import setUpEditWidgets
+        from zope.formlib.widgets import TextWidget
+
+        class OtherPrefixWidget(TextWidget):
+            def setPrefix(self, prefix):
+                self.name = 'other.' + self.context.__name__
+
+        class OtherNameWidget(TextWidget):
+            def setPrefix(self, prefix):
+                self.name = prefix + 'other'
+
+        schema, content, reads = self._makeContent()
+        request = self._makeRequest()
+        for factory in (OtherPrefixWidget, OtherNameWidget):
+            form_fields = FormFields(schema).select('title', 'body')
+            form_fields['body'].custom_widget = factory
+            widgets = setUpEditWidgets(form_fields, 'form', content, request,
+                                       lazy=True)
+            self.assertEqual(widgets['title'].name, 'form.title')
+            self.assertRaises(ValueError, widgets.get, 'body')
+        form_fields = FormFields(schema).select('body')
+        form_fields['body'].custom_widget = OtherPrefixWidget
+        self.assertRaises(ValueError, setUpEditWidgets,
+                          form_fields, 'form', content, request)
+
+    def test_form_validates_all_input_widgets(self):
+        from zope.formlib.form import EditForm
+        from zope.formlib.form import FormFields
+        schema, content, reads = self._makeContent()
+
+        class MyForm(EditForm):
+            form_fields = FormFields(schema)
+            lazy_widgets = True
+
+        request = self._makeRequest(form={'form.title': 'Hello',
+                                          'form.body': 'World',
+                                          'form.actions.apply': ''})
+        form = MyForm(content, request)
+        form.update()
+        self.assertEqual(form.errors, ())
+        self.assertEqual(content.__dict__, {'title': 'Hello',
+                                            'body': 'World'})
+
+    def test_form_without_submit_sets_up_few_widgets(self):
+        from zope.formlib.form import EditForm
+        from zope.formlib.form import FormFields
+        schema, content, reads = self._makeContent()
+
+        class MyForm(EditForm):
+            form_fields = FormFields(schema)
+            lazy_widgets = True
+
+        form = MyForm(content, self._makeRequest())
+        form.update()
+        self.assertEqual(reads, [])
+        # The apply action's condition looks for the first input widget.
+        self.assertEqual(len(form.availableActions()), 1)
+        self.assertEqual(reads, ['title'])
+
+
+class FormInputShortcutTests(PlacelessSetup, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        _provideTextWidgets()
+
+    def _makeContent(self):
+        from zope.interface import Interface
+        from zope.interface import implementer
+        from zope.schema import Choice
+        from zope.schema import TextLine
+        from zope.schema.vocabulary import SimpleVocabulary
+
+        class ISchema(Interface):
+            title = TextLine()
+            body = TextLine()
+            color = Choice(source=SimpleVocabulary.fromValues(
+                ['red', 'blue']))
+
+        @implementer(ISchema)
+        class Content:
+            def __getattr__(self, name):
+                if name.startswith('__'):
+                    raise AttributeError(name)
+                return name.upper()
+
+        return ISchema, Content(), None
+
+    def _makeRequest(self, **kw):
+        from zope.publisher.browser import TestRequest
+        return TestRequest(**kw)
+
+    def test_widgets_are_not_probed_without_input(self):
+        from zope.formlib.form import FormFields
+        from zope.formlib.form import setUpEditWidgets
+        from zope.formlib.widgets import TextWidget
+        schema, content, reads = self._makeContent()
+        probes = []
+
+        class Widget(TextWidget):
+            def hasInput(self):
+                probes.append(self.name)
+                return super().hasInput()
+
+        form_fields = FormFields(schema).select('title', 'body')
+        for form_field in form_fields:
+            form_field.custom_widget = Widget
+
+        request = self._makeRequest(form={'other.title': 'Other'})
+        widgets = setUpEditWidgets(form_fields, 'form', content, request)
+        self.assertEqual(probes, [])
+        self.assertEqual(widgets['title']._data, 'TITLE')
+
+        request = self._makeRequest(form={'form.title': 'Hello'})
+        widgets = setUpEditWidgets(form_fields, 'form', content, request)
+        self.assertEqual(probes, ['form.title', 'form.body'])
+        self.assertEqual(widgets['body']._data, 'BODY')
+
+    def test_changed_request_form(self):
+        from zope.formlib.form import FormFields
+        from zope.formlib.form import setUpEditWidgets
+        schema, content, reads = self._makeContent()
+        form_fields = FormFields(schema).select('title')
+        request = self._makeRequest(form={'other.title': 'Other'})
+        widgets = setUpEditWidgets(form_fields, 'form', content, request)
+        self.assertEqual(widgets['title']._data, 'TITLE')
+        del request.form['other.title']
+        request.form['form.title'] = 'Hello'
+        widgets = setUpEditWidgets(form_fields, 'form', content, request)
+        self.assertFalse(widgets['title']._renderedValueSet())
+        self.assertEqual(widgets['title'].getInputValue(), 'Hello')
+
+    def test_widgets_reading_the_request_are_probed(self):
+        # Source widgets also look for their input outside of the form.
+        from zope.browser.interfaces import ITerms
+        from zope.component import provideAdapter
+        from zope.interface import Interface
+        from zope.interface import implementer
+        from zope.publisher.interfaces.browser import IBrowserRequest
+
+        from zope.formlib.form import FormFields
+        from zope.formlib.form import setUpEditWidgets
+        from zope.formlib.interfaces import ISourceQueryView
+        from zope.formlib.source import SourceInputWidget
+
+        @implementer(ITerms)
+        class Terms:
+            def __init__(self, source, request):
+                self.source = source
+
+            def getValue(self, token):
+                return self.source.getTermByToken(token).value
+
+        @implementer(ISourceQueryView)
+        class QueryView:
+            def __init__(self, source, request):
+                pass
+
+        provideAdapter(Terms, (Interface, IBrowserRequest))
+        provideAdapter(QueryView, (Interface, IBrowserRequest))
+        schema, content, reads = self._makeContent()
+        form_fields = FormFields(schema).select('color')
+        form_fields['color'].custom_widget = (
+            lambda field, request: SourceInputWidget(
+                field, field.source, request))
+
+        request = self._makeRequest(
+            environ={'HTTP_COOKIE': 'form.color=blue'})
+        widgets = setUpEditWidgets(form_fields, 'form', content, request)
+        self.assertFalse(widgets['color']._renderedValueSet())
+
+        request = self._makeRequest()
+        widgets = setUpEditWidgets(form_fields, 'form', content, request)
+        self.assertEqual(widgets['color']._data, 'COLOR')
+
+
+class SchemaAdaptersTests(PlacelessSetup, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        from zope.component import provideAdapter
+        from zope.interface import Interface
+        from zope.interface import Invalid
+        from zope.interface import implementer
+        from zope.interface import invariant
+        from zope.schema import TextLine
+        _provideTextWidgets()
+
+        class IContent(Interface):
+            pass
+
+        class ISchema(Interface):
+            title = TextLine()
+            body = TextLine()
+
+            @invariant
+            def different(data):
+                if data.title == data.body:
+                    raise Invalid('Title and body must differ')
+
+        @implementer(IContent)
+        class Content:
+            title = 'Title'
+            body = 'Body'
+
+        created = self.created = []
+
+        @implementer(ISchema)
+        class Adapter:
+            def __init__(self, context):
+                created.append(context)
+                self.context = context
+
+            def __getattr__(self, name):
+                return getattr(self.context, name)
+
+            def __setattr__(self, name, value):
+                if name == 'context':
+                    self.__dict__[name] = value
+                else:
+                    setattr(self.context, name, value)
+
+        provideAdapter(Adapter, (IContent,), ISchema)
+        self.schema = ISchema
+        self.content = Content()
+
+    def _makeRequest(self, **kw):
+        from zope.publisher.browser import TestRequest
+        return TestRequest(**kw)
+
+    def _makeForm(self, request, prefix='form'):
+        from zope.formlib.form import EditForm
+        from zope.formlib.form import FormFields
+
+        class MyForm(EditForm):
+            form_fields = FormFields(self.schema)
+
+        form = MyForm(self.content, request)
+        form.setPrefix(prefix)
+        return form
+
+    def test_adapters_are_shared_per_request(self):
+        from zope.formlib.form import getSchemaAdapters
+        request = self._makeRequest()
+        forms = [self._makeForm(request, 'form%d' % i) for i in range(3)]
+        for form in forms:
+            form.update()
+        self.assertEqual(self.created, [self.content])
+        adapters = getSchemaAdapters(self.content, request)
+        self.assertIs(forms[2].adapters, adapters)
+        self.assertIs(adapters[self.schema], adapters['ISchema'])
+
+        self._makeForm(self._makeRequest()).update()
+        self.assertEqual(len(self.created), 2)
+
+    def test_adapters_per_context(self):
+        from zope.formlib.form import getSchemaAdapters
+        request = self._makeRequest()
+        adapters = getSchemaAdapters(self.content, request)
+        self.assertIs(getSchemaAdapters(self.content, request), adapters)
+        self.assertIsNot(getSchemaAdapters(object(), request), adapters)
+
+    def test_request_without_annotations(self):
+        from zope.formlib.form import getSchemaAdapters
+
+        class Request:
+            pass
+
+        request = Request()
+        self.assertIsNot(getSchemaAdapters(self.content, request),
+                         getSchemaAdapters(self.content, request))
+
+    def test_submit_adapts_once(self):
+        request = self._makeRequest(form={'form.title': 'New title',
+                                          'form.actions.apply': ''})
+        form = self._makeForm(request)
+        form.update()
+        self.assertEqual(form.errors, ())
+        self.assertEqual(self.content.title, 'New title')
+        self.assertEqual(self.created, [self.content])
+
+    def test_checkInvariants_adapts_once(self):
+        from zope.formlib.form import FormFields
+        from zope.formlib.form import checkInvariants
+        form_fields = FormFields(self.schema).omit('body')
+        errors = checkInvariants(form_fields, {'title': 'Body'}, self.content)
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(self.created, [self.content])
+
+        adapters = {}
+        checkInvariants(form_fields, {'title': 'x'}, self.content, adapters)
+        checkInvariants(form_fields, {'title': 'y'}, self.content, adapters)
+        self.assertEqual(len(self.created), 2)
+
+
+class FormErrorsTests(PlacelessSetup, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        from zope.interface import Interface
+        from zope.interface import Invalid
+        from zope.interface import invariant
+        from zope.schema import TextLine
+        _provideTextWidgets()
+
+        class ISchema(Interface):
+            title = TextLine()
+            body = TextLine()
+
+            @invariant
+            def different(data):
+                if data.title == data.body:
+                    raise Invalid('Title and body must differ')
+
+        self.schema = ISchema
+
+    def _makeForm(self, form, prefix='form'):
+        from zope.publisher.browser import TestRequest
+
+        from zope.formlib.form import FormBase
+        from zope.formlib.form import FormFields
+        from zope.formlib.form import action
+
+        class MyForm(FormBase):
+            form_fields = FormFields(self.schema)
+
+            @action('Apply')
+            def handle_apply(self, action, data):
+                pass
+
+        view = MyForm(None, TestRequest(form=form))
+        view.setPrefix(prefix)
+        return view
+
+    def test_errors_are_indexed(self):
+        from zope.formlib.form import FormErrors
+        from zope.formlib.interfaces import IFormErrors
+        view = self._makeForm({'form.title': '', 'form.body': 'Body',
+                               'form.actions.apply': ''})
+        view.update()
+        errors = view.errors
+        self.assertIsInstance(errors, FormErrors)
+        self.assertTrue(IFormErrors.providedBy(errors))
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors.forWidget('form.title'), tuple(errors))
+        self.assertEqual(errors.forWidget('form.body'), ())
+        self.assertEqual(errors.ofKind('validation'), tuple(errors))
+        self.assertEqual(errors.ofKind('invariant'), ())
+
+    def test_invariant_errors(self):
+        view = self._makeForm({'form.title': 'Same', 'form.body': 'Same',
+                               'form.actions.apply': ''})
+        view.update()
+        self.assertEqual(len(view.errors), 1)
+        self.assertEqual(view.errors.ofKind('invariant'), view.errors)
+        self.assertEqual(view.errors.forWidget('form.title'), ())
+
+    def test_no_errors(self):
+        view = self._makeForm({'form.title': 'Title', 'form.body': 'Body',
+                               'form.actions.apply': ''})
+        view.update()
+        self.assertEqual(view.errors, ())
+
+    def test_not_submitted(self):
+        from zope.formlib.form import FormErrors
+        view = self._makeForm({})
+        self.assertEqual(view.errors.forWidget('form.title'), ())
+        view.update()
+        self.assertIsInstance(view.errors, FormErrors)
+        self.assertEqual(view.errors.ofKind('validation'), ())
+        view = self._makeForm({})
+        view.errors = ()
+        view.update()
+        self.assertIsInstance(view.errors, FormErrors)
+        view = self._makeForm({})
+        view.errors = None
+        view.update()
+        self.assertEqual(view.errors.forWidget('form.title'), ())
+
+    def test_errors_of_subforms_are_merged(self):
+        subform = self._makeForm({'sub.title': 'Same', 'sub.body': 'Same',
+                                  'sub.actions.apply': ''}, prefix='sub')
+        subform.update()
+        view = self._makeForm({'form.title': '', 'form.body': 'Body',
+                               'form.actions.apply': ''})
+        view.errors = subform.errors
+        view.update()
+        self.assertEqual(len(view.errors), 2)
+        self.assertEqual(len(view.errors.forWidget('form.title')), 1)
+        self.assertEqual(len(view.errors.ofKind('invariant')), 1)
+
+    def test_add(self):
+        from zope.formlib.form import FormErrors
+        from zope.formlib.interfaces import ConversionError
+        from zope.formlib.interfaces import InvalidCSRFTokenError
+        conversion = ConversionError('Bad')
+        csrf = InvalidCSRFTokenError('Invalid')
+        errors = FormErrors([conversion]) + ['A message', csrf]
+        self.assertIsInstance(errors, FormErrors)
+        self.assertEqual(errors, (conversion, 'A message', csrf))
+        self.assertEqual(errors.ofKind('conversion'), (conversion,))
+        self.assertEqual(errors.ofKind('other'), ('A message',))
+        self.assertEqual(errors.ofKind('csrf'), (csrf,))
+        errors = ('A message',) + FormErrors([conversion])
+        self.assertIsInstance(errors, FormErrors)
+        self.assertEqual(errors, ('A message', conversion))
+
+    def test_getWidgetsData_records_widget_names(self):
+        from zope.formlib.form import FormErrors
+        from zope.formlib.form import getWidgetsData
+        view = self._makeForm({'form.title': '', 'form.body': ''})
+        view.setUpWidgets()
+        errors = getWidgetsData(view.widgets, 'form', {})
+        self.assertIsInstance(errors, list)
+        errors = FormErrors(errors + [])
+        self.assertEqual(len(errors.forWidget('form.title')), 1)
+        self.assertEqual(len(errors.forWidget('form.body')), 1)
+
+
+class InvariantSchemasTests(unittest.TestCase):
+
+    def setUp(self):
+        from zope.interface import Interface
+        from zope.interface import Invalid
+        from zope.interface import invariant
+        from zope.schema import TextLine
+
+        class IBase(Interface):
+            title = TextLine()
+
+            @invariant
+            def not_empty(data):
+                if not data.title:
+                    raise Invalid('Empty title')
+
+        class IDerived(IBase):
+            body = TextLine()
+
+        class IPlain(Interface):
+            summary = TextLine()
+
+        self.IBase, self.IDerived, self.IPlain = IBase, IDerived, IPlain
+
+    def test_schemas_without_invariants_are_skipped(self):
+        from zope.formlib.form import FormFields
+        from zope.formlib.form import getInvariantSchemas
+        form_fields = FormFields(self.IPlain, self.IDerived, prefix='x')
+        schemas = getInvariantSchemas(form_fields)
+        self.assertEqual(
+            schemas,
+            ((self.IDerived, (('x.title', 'title'), ('x.body', 'body'))),))
+        self.assertIs(getInvariantSchemas(form_fields), schemas)
+
+    def test_sequences_are_not_cached(self):
+        from zope.formlib.form import FormFields
+        from zope.formlib.form import getInvariantSchemas
+        form_fields = list(FormFields(self.IBase))
+        self.assertEqual(getInvariantSchemas(form_fields),
+                         ((self.IBase, (('title', 'title'),)),))
+
+    def test_custom_validation_is_kept(self):
+        from zope.interface.interface import InterfaceClass
+
+        from zope.formlib.form import FormFields
+        from zope.formlib.form import checkInvariants
+        from zope.formlib.form import getInvariantSchemas
+        validated = []
+
+        class ValidatingInterfaceClass(InterfaceClass):
+            def validateInvariants(self, obj, errors=None):
+                validated.append(obj.summary)
+
+        ICustom = ValidatingInterfaceClass(
+            'ICustom', (self.IPlain,), {'__module__': __name__})
+        form_fields = FormFields(ICustom)
+        self.assertEqual(len(getInvariantSchemas(form_fields)), 1)
+        checkInvariants(form_fields, {'summary': 'Summary'}, None)
+        self.assertEqual(validated, ['Summary'])
+
+    def test_checkInvariants(self):
+        from zope.formlib.form import FormFields
+        from zope.formlib.form import checkInvariants
+        form_fields = FormFields(self.IPlain, self.IDerived)
+        errors = checkInvariants(form_fields, {'title': ''}, None)
+        self.assertEqual([str(error) for error in errors], ['Empty title'])
+        self.assertEqual(checkInvariants(form_fields, {'title': 'T'}, None),
+                         [])
+
+    def test_FormData(self):
+        from zope.interface import implementer
+
+        from zope.formlib.form import FormData
+        reads = []
+
+        @implementer(self.IDerived)
+        class Content:
+            @property
+            def title(self):
+                reads.append('title')
+                return 'Title'
+
+        data = FormData(self.IDerived, {'body': 'Body'}, Content())
+        self.assertFalse(hasattr(data, '__dict__'))
+        self.assertEqual(data.body, 'Body')
+        self.assertEqual(data.title, 'Title')
+        self.assertEqual(data.title, 'Title')
+        self.assertEqual(reads, ['title'])
+        self.assertRaises(AttributeError, getattr, data, 'missing')
+
+
+class InvariantDependenciesTests(PlacelessSetup, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        from zope.interface import Interface
+        from zope.interface import Invalid
+        from zope.interface import implementer
+        from zope.interface import invariant
+        from zope.schema import Int
+        from zope.schema import TextLine
+
+        from zope.formlib.form import invariantDependsOn
+        _provideTextWidgets()
+        calls = self.calls = []
+
+        class IOrder(Interface):
+            name = TextLine()
+            min_size = Int()
+            max_size = Int()
+
+            @invariant
+            @invariantDependsOn('min_size', 'max_size')
+            def maxGreaterThanMin(order):
+                calls.append('maxGreaterThanMin')
+                if order.max_size < order.min_size:
+                    raise Invalid('Maximum is less than Minimum')
+
+            @invariant
+            def nameNotEmpty(order):
+                calls.append('nameNotEmpty')
+                if not order.name:
+                    raise Invalid('Empty name')
+
+        reads = self.reads = []
+
+        @implementer(IOrder)
+        class Order:
+            def __getattr__(self, name):
+                if name.startswith('__'):
+                    raise AttributeError(name)
+                reads.append(name)
+                return {'name': 'Bob', 'min_size': 1, 'max_size': 10}[name]
+
+        self.schema = IOrder
+        self.context = Order()
+
+    def _check(self, data, context=True):
+        from zope.formlib.form import FormFields
+        from zope.formlib.form import checkInvariants
+        del self.calls[:]
+        del self.reads[:]
+        errors = checkInvariants(
+            FormFields(self.schema), data,
+            self.context if context else None, skip_unaffected=True)
+        return [str(error) for error in errors]
+
+    def test_declared_dependencies(self):
+        from zope.formlib.form import getInvariantDependencies
+        self.assertEqual(
+            getInvariantDependencies(self.schema.getTaggedValue(
+                'invariants')[0]),
+            {'min_size', 'max_size'})
+        self.assertEqual(self._check({'name': 'Alice'}), [])
+        self.assertEqual(self.calls, ['nameNotEmpty'])
+        self.assertEqual(self.reads, [])
+
+    def test_unchanged_values_are_skipped(self):
+        self.assertEqual(self._check({'min_size': 1, 'max_size': 10}), [])
+        self.assertEqual(self.calls, ['nameNotEmpty'])
+
+    def test_changed_values_are_checked(self):
+        self.assertEqual(self._check({'max_size': 0}),
+                         ['Maximum is less than Minimum'])
+        self.assertEqual(self.calls, ['maxGreaterThanMin', 'nameNotEmpty'])
+        self.assertEqual(self.reads, ['max_size', 'min_size', 'name'])
+
+    def test_undeclared_dependencies(self):
+        from zope.formlib.form import getInvariantDependencies
+        invariant = self.schema.getTaggedValue('invariants')[1]
+        self.assertIsNone(getInvariantDependencies(invariant))
+        self.assertEqual(self._check({'name': 'Bob'}), [])
+        self.assertEqual(self.calls, ['nameNotEmpty'])
+        self.assertEqual(self._check({'min_size': 2}), [])
+        self.assertEqual(self.calls, ['maxGreaterThanMin', 'nameNotEmpty'])
+
+    def test_short_circuiting_invariant(self):
+        # Invariants aren't skipped based on the fields they happened to
+        # read, as they may read other fields for other values.
+        from zope.interface import Interface
+        from zope.interface import Invalid
+        from zope.interface import implementer
+        from zope.interface import invariant
+        from zope.schema import Int
+        from zope.schema import TextLine
+
+        from zope.formlib.form import FormFields
+        from zope.formlib.form import checkInvariants
+
+        class IItem(Interface):
+            kind = TextLine()
+            size = Int()
+
+            @invariant
+            def sizeForKind(item):
+                if item.kind == 'x' and item.size > 10:
+                    raise Invalid('too big for x')
+
+        @implementer(IItem)
+        class Item:
+            kind = 'x'
+            size = 5
+
+        form_fields = FormFields(IItem)
+        context = Item()
+        self.assertEqual(checkInvariants(
+            form_fields, {'kind': 'z', 'size': 50}, context,
+            skip_unaffected=True), [])
+        errors = checkInvariants(form_fields, {'kind': 'x', 'size': 50},
+                                 context, skip_unaffected=True)
+        self.assertEqual([str(error) for error in errors], ['too big for x'])
+
+    def test_without_context(self):
+        self.assertEqual(self._check({'min_size': 1, 'max_size': 10},
+                                     context=False), [])
+        self.assertEqual(self.calls, ['maxGreaterThanMin', 'nameNotEmpty'])
+
+    def test_form(self):
+        from zope.publisher.browser import TestRequest
+
+        from zope.formlib.form import EditForm
+        from zope.formlib.form import FormFields
+
+        class OrderForm(EditForm):
+            form_fields = FormFields(self.schema).select('name')
+            skip_unaffected_invariants = True
+
+        form = {'form.name': 'Bob', 'form.actions.apply': ''}
+        OrderForm(self.context, TestRequest(form=form)).update()
+        # The sizes weren't submitted; the name invariant doesn't declare
+        # its dependencies and is checked although the name is unchanged.
+        self.assertEqual(self.calls, ['nameNotEmpty'])
+
+
+class ChangeTrackingTests(PlacelessSetup, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        from zope.interface import Interface
+        from zope.interface import implementer
+        from zope.schema import TextLine
+        _provideTextWidgets()
+
+        class ISchema(Interface):
+            title = TextLine()
+            body = TextLine()
+
+        log = self.log = []
+
+        @implementer(ISchema)
+        class Content:
+            def __init__(self):
+                self.__dict__['values'] = {'title': 'Title', 'body': 'Body'}
+
+            def __getattr__(self, name):
+                if name.startswith('__'):
+                    raise AttributeError(name)
+                log.append(('get', name))
+                return self.values[name]
+
+            def __setattr__(self, name, value):
+                log.append(('set', name))
+                self.values[name] = value
+
+        self.schema = ISchema
+        self.content = Content()
+
+    def _makeForm(self, form=None):
+        from zope.publisher.browser import TestRequest
+
+        from zope.formlib.form import EditForm
+        from zope.formlib.form import FormFields
+
+        class MyForm(EditForm):
+            form_fields = FormFields(self.schema)
+            track_changes = True
+
+        return MyForm(self.content, TestRequest(form=form or {}))
+
+    def test_fingerprint(self):
+        import datetime
+
+        from zope.formlib.form import fingerprint
+        self.assertEqual(fingerprint('abc'), '6c63e9f3f2941cce')
+        self.assertNotEqual(fingerprint('1'), fingerprint(1))
+        self.assertNotEqual(fingerprint(1), fingerprint(True))
+        self.assertEqual(fingerprint({'a', 'b'}), fingerprint({'b', 'a'}))
+        self.assertNotEqual(fingerprint(['a', 'b']), fingerprint(['b', 'a']))
+        self.assertIsNotNone(fingerprint(datetime.date(2026, 1, 1)))
+        self.assertIsNone(fingerprint(object()))
+        self.assertIsNone(fingerprint(['a', object()]))
+
+    def test_parse_and_format(self):
+        from zope.formlib.form import formatFingerprints
+        from zope.formlib.form import parseFingerprints
+        fingerprints = {'title': 'aa', 'body': 'bb'}
+        text = formatFingerprints(fingerprints)
+        self.assertEqual(text, 'body=bb title=aa')
+        self.assertEqual(parseFingerprints(text), fingerprints)
+        self.assertEqual(parseFingerprints('x =y title=aa'), {'title': 'aa'})
+        self.assertEqual(parseFingerprints(None), {})
+
+    def test_applyData(self):
+        from zope.formlib.form import FormFields
+        from zope.formlib.form import applyData
+        from zope.formlib.form import fingerprint
+        fingerprints = {'title': fingerprint('Title'),
+                        'body': fingerprint('Body')}
+        descriptions = applyData(
+            self.content, FormFields(self.schema),
+            {'title': 'Title', 'body': 'New body'}, fingerprints=fingerprints)
+        self.assertEqual(descriptions, {self.schema: ['body']})
+        self.assertEqual(self.log, [('get', 'body'), ('set', 'body')])
+
+    def test_fingerprints_are_rendered(self):
+        from zope.formlib.form import fingerprint
+        form = self._makeForm()
+        form.setUpWidgets()
+        self.assertEqual(form.fingerprints,
+                         {'title': fingerprint('Title'),
+                          'body': fingerprint('Body')})
+        self.assertEqual(
+            form.renderFingerprints(),
+            '<input type="hidden" name="form.__fingerprints__" value="%s" />'
+            % 'body={} title={}'.format(fingerprint('Body'),
+                                        fingerprint('Title')))
+
+    def test_unchanged_submit(self):
+        form = self._makeForm()
+        form.setUpWidgets()
+        fingerprints = form.renderFingerprints().split('value="')[1][:-4]
+        del self.log[:]
+        form = self._makeForm({'form.title': 'Title', 'form.body': 'Body',
+                               'form.__fingerprints__': fingerprints,
+                               'form.actions.apply': ''})
+        form.update()
+        self.assertEqual(form.status, 'No changes')
+        self.assertEqual(self.log, [])
+
+    def test_changed_submit(self):
+        form = self._makeForm()
+        form.setUpWidgets()
+        fingerprints = form.renderFingerprints().split('value="')[1][:-4]
+        del self.log[:]
+        form = self._makeForm({'form.title': 'New', 'form.body': 'Body',
+                               'form.__fingerprints__': fingerprints,
+                               'form.actions.apply': ''})
+        form.update()
+        self.assertEqual(self.log[:2], [('get', 'title'), ('set', 'title')])
+        self.assertEqual(self.content.values['title'], 'New')
+
+    def test_concurrent_edits(self):
+        # Fingerprints are of the rendered values: unchanged fields keep
+        # the first edit, changed fields overwrite it.
+        form = self._makeForm()
+        form.setUpWidgets()
+        fingerprints = form.renderFingerprints().split('value="')[1][:-4]
+        # Someone else saves both fields after the form was rendered.
+        self.content.values.update(title='First title', body='First body')
+        form = self._makeForm({'form.title': 'Title',
+                               'form.body': 'Second body',
+                               'form.__fingerprints__': fingerprints,
+                               'form.actions.apply': ''})
+        form.update()
+        self.assertEqual(self.content.values,
+                         {'title': 'First title', 'body': 'Second body'})
+
+    def test_not_tracked(self):
+        form = self._makeForm()
+        form.track_changes = False
+        form.setUpWidgets()
+        self.assertIsNone(form.fingerprints)
+        self.assertEqual(form.renderFingerprints(), '')
+
+
+class _CountingChecker(Checker):
+
+    def __init__(self, checks, get_permissions, set_permissions):
+        super().__init__(get_permissions, set_permissions)
+        self.checks = checks
+
+    def check_setattr(self, object, name):
+        self.checks.append(name)
+        return super().check_setattr(object, name)
+
+
+class WritePermissionTests(PlacelessSetup, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        from zope.interface import Interface
+        from zope.interface import implementer
+        from zope.schema import TextLine
+        from zope.security.checker import CheckerPublic
+        from zope.security.checker import defineChecker
+        _provideTextWidgets()
+
+        class ISchema(Interface):
+            title = TextLine()
+            body = TextLine()
+
+        @implementer(ISchema)
+        class Content:
+            title = 'Title'
+            body = 'Body'
+
+        checks = self.checks = []
+        checker = _CountingChecker(
+            checks,
+            {'title': CheckerPublic, 'body': CheckerPublic},
+            {'title': CheckerPublic})
+        defineChecker(Content, checker)
+        self.schema = ISchema
+        self.content = Content()
+
+    def _makeRequest(self, **kw):
+        from zope.publisher.browser import TestRequest
+        return TestRequest(**kw)
+
+    def test_canWrite(self):
+        from zope.formlib.form import canWrite
+        self.assertTrue(canWrite(self.content, self.schema['title']))
+        self.assertFalse(canWrite(self.content, self.schema['body']))
+
+    def test_canWriteFields(self):
+        from zope.formlib.form import canWriteFields
+        request = self._makeRequest()
+        fields = [self.schema['title'], self.schema['body']]
+        expected = {'title': True, 'body': False}
+        self.assertEqual(canWriteFields(self.content, fields, request),
+                         expected)
+        self.assertEqual(self.checks, ['title', 'body'])
+        self.assertEqual(canWriteFields(self.content, fields, request),
+                         expected)
+        self.assertEqual(self.checks, ['title', 'body'])
+        canWriteFields(self.content, fields, self._makeRequest())
+        self.assertEqual(len(self.checks), 4)
+
+    def test_forms_share_decisions(self):
+        from zope.formlib.form import EditForm
+        from zope.formlib.form import FormFields
+        from zope.formlib.interfaces import DISPLAY_UNWRITEABLE
+
+        class MyForm(EditForm):
+            form_fields = FormFields(self.schema,
+                                     render_context=DISPLAY_UNWRITEABLE)
+
+        request = self._makeRequest()
+        for prefix in ('first', 'second'):
+            form = MyForm(self.content, request)
+            form.setPrefix(prefix)
+            form.update()
+            widgets = form.widgets.__iter_input_and_widget__()
+            self.assertEqual([input for input, w in widgets], [True, False])
+        self.assertEqual(self.checks, ['title', 'body'])
+
+    def test_handler_changing_permissions(self):
+        from zope.security.checker import getCheckerForInstancesOf
+
+        from zope.formlib.form import EditForm
+        from zope.formlib.form import FormFields
+        from zope.formlib.form import action
+        from zope.formlib.interfaces import DISPLAY_UNWRITEABLE
+        from zope.formlib.widgets import UnicodeDisplayWidget
+        checker = getCheckerForInstancesOf(type(self.content))
+
+        class MyForm(EditForm):
+            form_fields = FormFields(self.schema,
+                                     render_context=DISPLAY_UNWRITEABLE)
+
+            @action('Lock')
+            def lock(self, action, data):
+                checker.set_permissions.clear()
+                self.resetForm()
+
+        request = self._makeRequest(form={'form.actions.lock': ''})
+        form = MyForm(self.content, request)
+        form.update()
+        self.assertIsInstance(form.widgets['title'], UnicodeDisplayWidget)
+
+
+class BoundActionsTests(unittest.TestCase):
+
+    def _makeForm(self):
+        from zope.publisher.browser import TestRequest
+
+        from zope.formlib.form import FormBase
+        from zope.formlib.form import action
+
+        class MyForm(FormBase):
+            @action('Save')
+            def handle_save(self, action, data):
+                pass
+
+            @action('Cancel')
+            def handle_cancel(self, action, data):
+                pass
+
+        return MyForm(None, TestRequest())
+
+    def test_actions_are_bound_once(self):
+        from zope.formlib.interfaces import IAction
+        from zope.formlib.interfaces import IBoundAction
+        form = self._makeForm()
+        actions = form.actions
+        self.assertIs(form.actions, actions)
+        self.assertIs(form.actions['form.actions.save'].form, form)
+        for bound in actions:
+            self.assertTrue(IBoundAction.providedBy(bound))
+            self.assertTrue(IAction.providedBy(bound))
+        unbound = type(form).actions.actions[0]
+        self.assertFalse(IBoundAction.providedBy(unbound))
+        self.assertIsNot(self._makeForm().actions, actions)
+
+    def test_prefix_change(self):
+        form = self._makeForm()
+        form.actions
+        form.setPrefix('other')
+        self.assertEqual([a.__name__ for a in form.actions],
+                         ['other.actions.save', 'other.actions.cancel'])
+
+    def test_appended_actions(self):
+        from zope.formlib.form import Action
+        form = self._makeForm()
+        form.actions
+        type(form).actions.append(Action('Delete'))
+        self.assertEqual(len(form.actions.actions), 3)
+        self.assertIs(form.actions['form.actions.delete'].form, form)
+
+    def test_directly_provided_interfaces(self):
+        from zope.interface import Interface
+        from zope.interface import alsoProvides
+
+        from zope.formlib.interfaces import IBoundAction
+
+        class IMarker(Interface):
+            pass
+
+        form = self._makeForm()
+        alsoProvides(type(form).actions.actions[0], IMarker)
+        bound = form.actions.actions[0]
+        self.assertTrue(IMarker.providedBy(bound))
+        self.assertTrue(IBoundAction.providedBy(bound))
+        self.assertFalse(IMarker.providedBy(form.actions.actions[1]))
+
+
+class HandleSubmitTests(unittest.TestCase):
+
+    def _makeForm(self, form=None, action_class=None):
+        from zope.publisher.browser import TestRequest
+
+        from zope.formlib.form import Action
+        from zope.formlib.form import Actions
+        from zope.formlib.form import FormBase
+
+        conditions = []
+
+        def condition(form, action):
+            conditions.append(action.__name__)
+            return True
+
+        action_class = action_class or Action
+
+        class MyForm(FormBase):
+            actions = Actions(*[
+                action_class(label, condition=condition)
+                for label in ('Save', 'Preview', 'Cancel')])
+
+        return MyForm(None, TestRequest(form=form or {})), conditions
+
+    def test_nothing_submitted(self):
+        from zope.formlib.form import handleSubmit
+        form, conditions = self._makeForm({'form.title': 'Title'})
+        self.assertEqual(handleSubmit(form.actions, {}), (None, None))
+        self.assertEqual(conditions, [])
+
+    def test_only_submitted_condition_is_evaluated(self):
+        from zope.formlib.form import handleSubmit
+        form, conditions = self._makeForm({'form.actions.cancel': ''})
+        errors, action = handleSubmit(form.actions, {})
+        self.assertEqual(action.__name__, 'form.actions.cancel')
+        self.assertEqual(conditions, ['form.actions.cancel'])
+
+    def test_first_submitted_action_wins(self):
+        from zope.formlib.form import handleSubmit
+        form, conditions = self._makeForm(
+            {'a': '', 'b': '', 'form.actions.cancel': '',
+             'form.actions.preview': ''})
+        errors, action = handleSubmit(form.actions, {})
+        self.assertEqual(action.__name__, 'form.actions.preview')
+
+    def test_first_of_actions_sharing_a_name_wins(self):
+        from zope.publisher.browser import TestRequest
+
+        from zope.formlib.form import FormBase
+        from zope.formlib.form import action
+
+        class BaseForm(FormBase):
+            form_fields = ()
+
+            @action('Apply')
+            def handle_apply(self, action, data):
+                self.status = 'First'
+
+        class MyForm(BaseForm):
+            actions = BaseForm.actions.copy()
+
+            @action('Apply')
+            def handle_other_apply(self, action, data):
+                self.status = 'Second'
+
+        form = MyForm(None, TestRequest(form={'form.actions.apply': ''}))
+        form.update()
+        self.assertEqual(form.status, 'First')
+
+    def test_custom_submitted(self):
+        from zope.formlib.form import Action
+        from zope.formlib.form import handleSubmit
+
+        class ImageAction(Action):
+            def submitted(self):
+                return (self.__name__ + '.x' in self.form.request.form
+                        and self.available())
+
+        form, conditions = self._makeForm(
+            {'form.actions.cancel.x': '10'}, ImageAction)
+        errors, action = handleSubmit(form.actions, {})
+        self.assertEqual(action.__name__, 'form.actions.cancel')
+
+
+class AvailabilityTests(unittest.TestCase):
+
+    def _makeForm(self, form=None):
+        from zope.publisher.browser import TestRequest
+
+        from zope.formlib.form import FormBase
+        from zope.formlib.form import action
+
+        conditions = []
+
+        def condition(form, action):
+            conditions.append(action.__name__)
+            return not form.saved
+
+        class MyForm(FormBase):
+            form_fields = ()
+            saved = False
+
+            def template(self):
+                # Like pageform.pt and render_submit_button
+                return ' '.join(action.__name__
+                                for action in self.availableActions()
+                                if action.available())
+
+            @action('Save', condition=condition)
+            def handle_save(self, action, data):
+                self.saved = True
+
+            @action('Publish', condition=condition)
+            def handle_publish(self, action, data):
+                pass
+
+        return MyForm(None, TestRequest(form=form or {})), conditions
+
+    def test_conditions_are_evaluated_once(self):
+        form, conditions = self._makeForm()
+        form.update()
+        self.assertEqual(conditions, [])
+        self.assertIn('form.actions.publish', form.render())
+        self.assertEqual(conditions,
+                         ['form.actions.save', 'form.actions.publish'])
+
+    def test_availability_is_forgotten_after_success(self):
+        form, conditions = self._makeForm({'form.actions.save': ''})
+        form.update()
+        self.assertTrue(form.saved)
+        self.assertEqual(form.render(), '')
+        self.assertEqual(conditions,
+                         ['form.actions.save', 'form.actions.save',
+                          'form.actions.publish'])
+
+    def test_forgetAvailability(self):
+        from zope.formlib.form import forgetAvailability
+        form, conditions = self._makeForm()
+        self.assertEqual(len(form.availableActions()), 2)
+        form.saved = True
+        self.assertEqual(len(form.availableActions()), 2)
+        forgetAvailability(form.actions)
+        self.assertEqual(form.availableActions(), [])
+        forgetAvailability(())
+
+
+class InstrumentationTests(PlacelessSetup, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        from zope.component import provideAdapter
+        from zope.component import provideUtility
+        from zope.interface import implementer
+        from zope.publisher.interfaces.browser import IBrowserRequest
+
+        from zope.formlib.interfaces import IFormInstrumentation
+        from zope.formlib.interfaces import IWidgetInputError
+        from zope.formlib.interfaces import IWidgetInputErrorView
+        _provideTextWidgets()
+        records = self.records = []
+
+        @implementer(IFormInstrumentation)
+        class Instrumentation:
+            def record(self, form, phase, duration, widget=None):
+                self.last_form = form
+                records.append(
+                    (phase, widget.name if widget is not None else None))
+
+        @implementer(IWidgetInputErrorView)
+        class ErrorView:
+            def __init__(self, error, request):
+                self.error = error
+
+            def snippet(self):
+                return 'Error'
+
+        self.instrumentation = Instrumentation()
+        provideUtility(self.instrumentation, IFormInstrumentation)
+        provideAdapter(ErrorView, (IWidgetInputError, IBrowserRequest),
+                       IWidgetInputErrorView)
+
+    def _makeForm(self, form):
+        from zope.interface import Interface
+        from zope.interface import implementer
+        from zope.publisher.browser import TestRequest
+        from zope.schema import TextLine
+
+        from zope.formlib.form import EditForm
+        from zope.formlib.form import FormFields
+
+        class ISchema(Interface):
+            title = TextLine()
+            body = TextLine(min_length=5)
+
+        @implementer(ISchema)
+        class Content:
+            title = 'Title'
+            body = 'Body text'
+
+        class MyForm(EditForm):
+            form_fields = FormFields(ISchema)
+
+            def template(self):
+                return '\n'.join([widget() for widget in self.widgets]
+                                 + list(self.error_views()))
+
+        return MyForm(Content(), TestRequest(form=form))
+
+    def test_phases_are_recorded(self):
+        form = self._makeForm({'form.title': 'New',
+                               'form.body': 'New body',
+                               'form.actions.apply': ''})
+        form.update()
+        result = form.render()
+        self.assertIn('value="New"', result)
+        self.assertEqual(self.records, [
+            ('setUpWidgets', None),
+            ('getInputValue', 'form.title'),
+            ('getInputValue', 'form.body'),
+            ('getWidgetsData', None),
+            ('checkInvariants', None),
+            ('success', None),
+            ('renderWidget', 'form.title'),
+            ('renderWidget', 'form.body'),
+            ('error_views', None),
+            ('render', None),
+        ])
+        self.assertIs(self.instrumentation.last_form, form)
+        self.assertEqual(form.widgets['title'].__class__.__name__,
+                         'TextWidget')
+
+    def test_failure(self):
+        form = self._makeForm({'form.title': 'New',
+                               'form.body': 'New',
+                               'form.actions.apply': ''})
+        form.update()
+        self.assertIn(('failure', None), self.records)
+        self.assertIn('Error', form.render())
+
+    def test_getWidgetsData_without_form(self):
+        from zope.formlib.form import getWidgetsData
+        form = self._makeForm({'form.title': 'New'})
+        form.setUpWidgets()
+        data = {}
+        getWidgetsData(form.widgets, 'form', data)
+        self.assertEqual(data, {'title': 'New'})
+        self.assertEqual(self.records, [('getInputValue', 'form.title')])
+        self.assertIsNone(self.instrumentation.last_form)
+
+    def test_lazy_widgets_stay_lazy(self):
+        form = self._makeForm({})
+        form.lazy_widgets = True
+        form.template = lambda: form.widgets['title']()
+        form.update()
+        widgets = form.widgets
+        self.assertIn('value="Title"', form.render())
+        self.assertIs(form.widgets, widgets)
+        self.assertEqual(
+            [item is not None for item in widgets.__LazyWidgets_items__],
+            [True, False])
+        self.assertEqual(self.records[-2:],
+                         [('renderWidget', 'form.title'), ('render', None)])
+
+
+def _provideStandardMacros():
+    """Provide a minimal ``standard_macros`` view for page forms."""
+    import zope.traversing.testing
+    from zope.component import adapter
+    from zope.component import provideAdapter
+    from zope.interface import Interface
+    from zope.pagetemplate.pagetemplate import PageTemplate
+    from zope.traversing.interfaces import ITraversable
+    from zope.traversing.namespace import view
+    zope.traversing.testing.setUp()
+    provideAdapter(view, (None, None), ITraversable, name='view')
+    template = PageTemplate()
+    template.write('<html metal:define-macro="view">\n'
+                   '<body metal:define-slot="body" />\n'
+                   '</html>\n')
+
+    @adapter(None, None)
+    class StandardMacros:
+        def __init__(self, context, request):
+            pass
+
+        def __getitem__(self, name):
+            return template.macros[name]
+
+    provideAdapter(StandardMacros, provides=Interface,
+                   name='standard_macros')
+
+
+class RenderChunksTests(PlacelessSetup, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        from zope.component import provideAdapter
+        from zope.publisher.interfaces.browser import IBrowserRequest
+
+        from zope.formlib.exception import WidgetInputErrorView
+        from zope.formlib.form import render_submit_button
+        from zope.formlib.interfaces import IWidgetInputError
+        from zope.formlib.interfaces import IWidgetInputErrorView
+        _provideTextWidgets()
+        provideAdapter(render_submit_button, name='render')
+        provideAdapter(WidgetInputErrorView,
+                       (IWidgetInputError, IBrowserRequest),
+                       IWidgetInputErrorView)
+
+    def _makeForm(self, form=None):
+        from zope.interface import Interface
+        from zope.interface import implementer
+        from zope.publisher.browser import TestRequest
+        from zope.schema import TextLine
+
+        from zope.formlib.form import FormFields
+        from zope.formlib.form import SubPageEditForm
+        from zope.formlib.form import action
+
+        class ISchema(Interface):
+            title = TextLine(title='Title', description='The <title>')
+            body = TextLine(title='Body', required=False)
+
+        @implementer(ISchema)
+        class Content:
+            title = 'Title'
+            body = 'Body text'
+
+        class MyForm(SubPageEditForm):
+            label = 'Edit'
+            form_fields = FormFields(ISchema)
+
+            @action('Go')
+            def go(self, action, data):
+                pass
+
+            def template(self):
+                raise AssertionError('The template is not used.')
+
+        return MyForm(Content(), TestRequest(form=form or {}))
+
+    def test_chunks(self):
+        form = self._makeForm()
+        form.update()
+        header, title, body, actions = form.renderChunks()
+        self.assertIn('<table class="form-fields">', header)
+        self.assertNotIn('form.title', header)
+        self.assertIn('name="form.title"', title)
+        self.assertIn('name="form.body"', body)
+        self.assertIn('form.actions.go', actions)
+        self.assertIn('<h1>Edit</h1>', header)
+        self.assertIn('id="field-help-for-form.title">The &lt;title&gt;',
+                      title)
+        self.assertIn('value="Body text"', body)
+
+    def test_errors(self):
+        form = self._makeForm({'form.title': '', 'form.actions.go': 'Go'})
+        form.update()
+        body = ''.join(form.renderChunks())
+        self.assertIn('<div class="summary">There were errors</div>', body)
+        self.assertIn('<div class="error">', body)
+
+    def test_page_form(self):
+        from zope.interface import alsoProvides
+
+        from zope.formlib.interfaces import IPageForm
+        _provideStandardMacros()
+        form = self._makeForm()
+        alsoProvides(form, IPageForm)
+        form.update()
+        chunks = form.renderChunks()
+        self.assertEqual(len(chunks), 6)
+        self.assertTrue(chunks[0].startswith('<html>'))
+        self.assertIn('<form action="http://127.0.0.1"', chunks[1])
+        self.assertIn('<span class="actionButtons">', chunks[4])
+        self.assertTrue(chunks[5].endswith('</html>\n'))
+
+
+class PythonTemplateTests(PlacelessSetup, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        from zope.configuration import xmlconfig
+
+        import zope.formlib.tests
+        xmlconfig.file('registerWidgets.zcml', zope.formlib.tests)
+        _provideStandardMacros()
+
+    def _makeForm(self, base, form=None, **attrs):
+        from zope.interface import Interface
+        from zope.interface import implementer
+        from zope.publisher.browser import TestRequest
+        from zope.schema import Int
+        from zope.schema import TextLine
+
+        from zope.formlib.form import FormFields
+
+        class ISchema(Interface):
+            title = TextLine(title='Title & name',
+                             description='The "title"')
+            count = Int(title='Count', required=False)
+
+        @implementer(ISchema)
+        class Content:
+            title = 'Title'
+            count = 1
+
+        class MyForm(base):
+            label = 'Edit <content>'
+            form_fields = FormFields(ISchema)
+
+        for name, value in attrs.items():
+            setattr(MyForm, name, value)
+        return MyForm(Content(), TestRequest(
+            form=form or {}, HTTP_COOKIE='__csrftoken__=token'))
+
+    def _normalize(self, markup):
+        import re
+
+        # The templates contain comments and a misspelt attribute.
+        markup = re.sub(r'<!--.*?-->', '', markup, flags=re.S)
+        markup = markup.replace(' define="error widget/error"', '')
+        markup = re.sub(r'>\s+', '>', markup)
+        return re.sub(r'\s+<', '<', markup).strip()
+
+    def _assertSameMarkup(self, base, form=None, **attrs):
+        from zope.formlib.form import default_page_template
+        from zope.formlib.form import default_subpage_template
+        from zope.formlib.form import python_page_template
+        from zope.formlib.form import python_subpage_template
+        from zope.formlib.interfaces import IPageForm
+        rendered = []
+        for page, subpage in ((default_page_template,
+                               default_subpage_template),
+                              (python_page_template,
+                               python_subpage_template)):
+            view = self._makeForm(base, form, **attrs)
+            view.update()
+            template = page if IPageForm.providedBy(view) else subpage
+            rendered.append(template(view)())
+        self.assertEqual(self._normalize(rendered[0]),
+                         self._normalize(rendered[1]))
+        return rendered[1]
+
+    def test_page_form(self):
+        from zope.formlib.form import EditForm
+        markup = self._assertSameMarkup(EditForm)
+        self.assertIn('<h1>Edit &lt;content&gt;</h1>', markup)
+        self.assertIn('for="form.title"', markup)
+
+    def test_subpage_form(self):
+        from zope.formlib.form import SubPageEditForm
+        self._assertSameMarkup(SubPageEditForm)
+
+    def test_errors(self):
+        from zope.formlib.form import EditForm
+        from zope.formlib.form import SubPageEditForm
+        request = {'form.title': '', 'form.count': 'x',
+                   'form.actions.apply': 'Apply'}
+        for base in (EditForm, SubPageEditForm):
+            markup = self._assertSameMarkup(base, request)
+            self.assertIn('<ul class="errors">', markup)
+            self.assertIn('<div class="error">', markup)
+
+    def test_protected_and_extra_script(self):
+        from zope.formlib.form import EditForm
+        from zope.formlib.form import SubPageEditForm
+        for base in (EditForm, SubPageEditForm):
+            markup = self._assertSameMarkup(
+                base, protected=True, extra_script='var a = 1;')
+            self.assertIn('name="___csrftoken__"', markup)
+            self.assertIn('var a = 1;', markup)
+
+    def test_track_changes(self):
+        from zope.formlib.form import EditForm
+        from zope.formlib.form import SubPageEditForm
+        for base in (EditForm, SubPageEditForm):
+            markup = self._assertSameMarkup(base, track_changes=True)
+            self.assertIn('name="form.__fingerprints__"', markup)
+
+    def test_translation(self):
+        from zope.component import provideUtility
+        from zope.i18n.interfaces import INegotiator
+        from zope.i18n.testmessagecatalog import TestMessageFallbackDomain
+        from zope.i18nmessageid import MessageFactory
+        from zope.interface import implementer
+
+        from zope.formlib.form import EditForm
+
+        @implementer(INegotiator)
+        class Negotiator:
+            def getLanguage(*ignored):
+                return 'test'
+
+        provideUtility(Negotiator())
+        provideUtility(TestMessageFallbackDomain)
+        _ = MessageFactory('my.domain')
+        markup = self._assertSameMarkup(EditForm, label=_('The label'))
+        self.assertIn('[[my.domain][The label]]', markup)
+        self.assertIn('[[default][Count]]', markup)
+
+    def test_registration(self):
+        from zope.configuration import xmlconfig
+
+        import zope.formlib
+        from zope.formlib.form import EditForm
+        from zope.formlib.form import _FormRenderer
+        xmlconfig.file('pythontemplates.zcml', zope.formlib)
+        view = self._makeForm(EditForm)
+        self.assertIsInstance(view.template.renderer, _FormRenderer)
+
+    def test_override_registration(self):
+        from zope.configuration import xmlconfig
+
+        from zope.formlib.form import EditForm
+        from zope.formlib.form import _FormRenderer
+        xmlconfig.string("""
+            <configure xmlns="http://namespaces.zope.org/zope">
+              <include package="zope.formlib" />
+              <includeOverrides package="zope.formlib"
+                                file="pythontemplates.zcml" />
+            </configure>
+            """)
+        view = self._makeForm(EditForm)
+        self.assertIsInstance(view.template.renderer, _FormRenderer)
+
+    def test_no_macros(self):
+        from zope.formlib.form import EditForm
+        from zope.formlib.form import python_page_template
+        view = self._makeForm(EditForm)
+        view.update()
+        template = python_page_template(view)
+        self.assertIn('Edit &lt;content&gt;', template())
+        with self.assertRaises(AttributeError) as context:
+            template.macros
+        self.assertIn('no macros', str(context.exception))
+
+
 def test_suite():
     return unittest.TestSuite((
         unittest.defaultTestLoader.loadTestsFromTestCase(FormBaseTests),
+        unittest.defaultTestLoader.loadTestsFromTestCase(FormFieldsTests),
+        unittest.defaultTestLoader.loadTestsFromTestCase(FormPlanTests),
+        unittest.defaultTestLoader.loadTestsFromTestCase(LazyWidgetsTests),
+        unittest.defaultTestLoader.loadTestsFromTestCase(
+            FormInputShortcutTests),
+        unittest.defaultTestLoader.loadTestsFromTestCase(SchemaAdaptersTests),
+        unittest.defaultTestLoader.loadTestsFromTestCase(FormErrorsTests),
+        unittest.defaultTestLoader.loadTestsFromTestCase(
+            InvariantSchemasTests),
+        unittest.defaultTestLoader.loadTestsFromTestCase(
+            InvariantDependenciesTests),
+        unittest.defaultTestLoader.loadTestsFromTestCase(ChangeTrackingTests),
+        unittest.defaultTestLoader.loadTestsFromTestCase(WritePermissionTests),
+        unittest.defaultTestLoader.loadTestsFromTestCase(BoundActionsTests),
+        unittest.defaultTestLoader.loadTestsFromTestCase(HandleSubmitTests),
+        unittest.defaultTestLoader.loadTestsFromTestCase(AvailabilityTests),
+        unittest.defaultTestLoader.loadTestsFromTestCase(InstrumentationTests),
+        unittest.defaultTestLoader.loadTestsFromTestCase(RenderChunksTests),
+        unittest.defaultTestLoader.loadTestsFromTestCase(PythonTemplateTests),
     ))
@@ -627,6 +627,221 @@ class MultiCheckBoxWidgetTest(ItemsMultiEditWidgetBaseTest):
         self.verifyResult(items[0], ['checked="checked"'])
 
 
+class CachedItemsTest(PlacelessSetup, unittest.TestCase):
+
+    def _makeVocabulary(self):
+        from zope.interface import alsoProvides
+
+        from zope.formlib.interfaces import ICacheableVocabulary
+        vocabulary = SimpleVocabulary(
+            [SimpleTerm(value, token, title) for value, token, title in (
+                ('one', 'token1', 'One'),
+                ('two', 'token2', 'Two'),
+                ('three', 'token3', 'Three'))])
+        alsoProvides(vocabulary, ICacheableVocabulary)
+        return vocabulary
+
+    def _makeWidgetClass(self, widget_class, texts):
+        class Widget(widget_class):
+            def textForValue(self, term):
+                texts.append(term.value)
+                return super().textForValue(term)
+        return Widget
+
+    def _makeWidget(self, widget_class, vocabulary):
+        field = ICollector['choice'].bind(Collector())
+        return widget_class(field, vocabulary, TestRequest())
+
+    def test_rendering_is_unchanged(self):
+        for widget_class in (SelectWidget, RadioWidget):
+            cached = self._makeWidget(widget_class, self._makeVocabulary())
+            uncached = self._makeWidget(widget_class, vocab)
+            for values in ([], ['two'], ['one', 'three']):
+                self.assertEqual(cached.renderItemsWithValues(values),
+                                 uncached.renderItemsWithValues(values))
+
+    def test_items_are_rendered_once(self):
+        vocabulary = self._makeVocabulary()
+        texts = []
+        widget_class = self._makeWidgetClass(SelectWidget, texts)
+        widget = self._makeWidget(widget_class, vocabulary)
+        widget.renderItemsWithValues(['one'])
+        widget = self._makeWidget(widget_class, vocabulary)
+        items = widget.renderItemsWithValues(['two'])
+        self.assertEqual(texts, ['one', 'two', 'three'])
+        self.assertEqual(
+            items,
+            ['<option value="token1">One</option>',
+             '<option selected="selected" value="token2">Two</option>',
+             '<option value="token3">Three</option>'])
+
+    def test_cache_version(self):
+        vocabulary = self._makeVocabulary()
+        texts = []
+        widget = self._makeWidget(
+            self._makeWidgetClass(SelectWidget, texts), vocabulary)
+        widget.renderItemsWithValues([])
+        widget.renderItemsWithValues([])
+        self.assertEqual(len(texts), 3)
+        vocabulary.cache_version = 2
+        widget.renderItemsWithValues([])
+        self.assertEqual(len(texts), 6)
+
+    def test_name_dependent_items(self):
+        vocabulary = self._makeVocabulary()
+        widget = self._makeWidget(RadioWidget, vocabulary)
+        widget.renderItemsWithValues([])
+        widget.setPrefix('other')
+        items = widget.renderItemsWithValues([])
+        self.assertIn('id="other.choice.0"', items[0])
+
+    def test_lru(self):
+        from zope.formlib.itemswidgets import _LRUCache
+        cache = _LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_lru_drops_stale_entries_first(self):
+        from zope.formlib.itemswidgets import _LRUCache
+        cache = _LRUCache(2, lambda entry: entry < 0)
+        cache.set('a', 1)
+        cache.set('b', -1)
+        cache.set('c', 3)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_vocabulary_is_not_kept_alive(self):
+        import gc
+        import weakref
+
+        from zope.formlib.itemswidgets import _items_cache
+        vocabulary = self._makeVocabulary()
+        self._makeWidget(SelectWidget, vocabulary).renderItemsWithValues([])
+        self.assertEqual(len(_items_cache.entries), 1)
+        ref = weakref.ref(vocabulary)
+        del vocabulary
+        gc.collect()
+        self.assertIsNone(ref())
+
+    def test_cache_key(self):
+        texts = []
+        widget_class = self._makeWidgetClass(SelectWidget, texts)
+        for i in range(2):
+            vocabulary = self._makeVocabulary()
+            vocabulary.cache_key = 'numbers'
+            self._makeWidget(
+                widget_class, vocabulary).renderItemsWithValues([])
+        self.assertEqual(len(texts), 3)
+
+    def test_preferred_languages(self):
+        from zope.component import provideAdapter
+        from zope.i18n.interfaces import IUserPreferredLanguages
+        from zope.interface import implementer
+        from zope.publisher.interfaces.browser import IBrowserRequest
+
+        @implementer(IUserPreferredLanguages)
+        class Languages:
+            def __init__(self, request):
+                self.request = request
+
+            def getPreferredLanguages(self):
+                return [self.request.get('LANGUAGE', 'en')]
+
+        provideAdapter(Languages, (IBrowserRequest,))
+        vocabulary = self._makeVocabulary()
+        texts = []
+        widget_class = self._makeWidgetClass(SelectWidget, texts)
+        field = ICollector['choice'].bind(Collector())
+        for language in ('xa', 'xb', 'xa'):
+            # The locale is the same for these languages.
+            request = TestRequest(LANGUAGE=language)
+            widget_class(field, vocabulary, request).renderItemsWithValues([])
+        self.assertEqual(len(texts), 6)
+
+
+class RenderIntoTest(PlacelessSetup, unittest.TestCase):
+
+    def _makeWidget(self, widget_class, field_name='choice'):
+        field = ICollector[field_name].bind(Collector())
+        return widget_class(field, vocab, TestRequest())
+
+    def _renderInto(self, widget):
+        out = ['before']
+        widget.renderInto(out)
+        self.assertEqual(out[0], 'before')
+        return ''.join(out[1:])
+
+    def test_same_as_call(self):
+        for widget_class, field_name, value in (
+                (SelectWidget, 'choice', 'two'),
+                (DropdownWidget, 'choice', 'two'),
+                (RadioWidget, 'choice', 'two'),
+                (MultiSelectWidget, 'numbers', ['one', 'three']),
+                (MultiCheckBoxWidget, 'numbers', ['one', 'three'])):
+            for orientation in ('vertical', 'horizontal'):
+                widget = self._makeWidget(widget_class, field_name)
+                widget.orientation = orientation
+                widget.setRenderedValue(value)
+                self.assertEqual(self._renderInto(widget), widget())
+
+    def test_empty_value(self):
+        widget = RadioWidget(
+            ICollector['choice'].bind(Collector()), SimpleVocabulary([]),
+            TestRequest())
+        self.assertNotIn('class="value"', widget())
+        self.assertEqual(self._renderInto(widget), widget())
+
+    def test_overridden_renderValue(self):
+        class Widget(SelectWidget):
+            def renderValue(self, value):
+                return '<custom %s>' % value
+
+        widget = self._makeWidget(Widget)
+        widget.setRenderedValue('one')
+        self.assertIn('<custom one>', widget())
+        self.assertEqual(self._renderInto(widget), widget())
+
+    def test_overridden_call(self):
+        class Widget(SelectWidget):
+            def __call__(self):
+                return '<custom>'
+
+        self.assertEqual(self._renderInto(self._makeWidget(Widget)),
+                         '<custom>')
+
+
+class SelectionTest(unittest.TestCase):
+
+    def _makeOne(self, values):
+        from zope.formlib.itemswidgets import _Selection
+        return _Selection(values)
+
+    def test_hashable(self):
+        selection = self._makeOne(['one', 2, ('three',)])
+        self.assertIn('one', selection)
+        self.assertIn(2.0, selection)
+        self.assertIn(('three',), selection)
+        self.assertNotIn('two', selection)
+
+    def test_unhashable(self):
+        selection = self._makeOne([['one'], 'two', {'three': 3}])
+        self.assertIn(['one'], selection)
+        self.assertIn({'three': 3}, selection)
+        self.assertIn('two', selection)
+        self.assertNotIn(['two'], selection)
+        self.assertNotIn('one', selection)
+
+    def test_iterator(self):
+        selection = self._makeOne(iter(['one', 'two']))
+        self.assertIn('two', selection)
+
+
 def test_suite():
     suite = unittest.defaultTestLoader.loadTestsFromTestCase(
         ItemDisplayWidgetTest)
@@ -654,4 +869,10 @@ def test_suite():
         OrderedMultiSelectWidgetTest))
     suite.addTest(unittest.defaultTestLoader.loadTestsFromTestCase(
         MultiCheckBoxWidgetTest))
+    suite.addTest(
+        unittest.defaultTestLoader.loadTestsFromTestCase(CachedItemsTest))
+    suite.addTest(
+        unittest.defaultTestLoader.loadTestsFromTestCase(RenderIntoTest))
+    suite.addTest(
+        unittest.defaultTestLoader.loadTestsFromTestCase(SelectionTest))
     return suite
@@ -0,0 +1,148 @@
+##############################################################################
+#
+# Copyright (c) 2026 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Warm-up tests
+"""
+import os
+import unittest
+
+from zope.browserpage import ViewPageTemplateFile
+from zope.component import getSiteManager
+from zope.component import provideAdapter
+from zope.component.testing import PlacelessSetup
+from zope.configuration import xmlconfig
+from zope.interface import Interface
+from zope.interface import implementer
+from zope.interface.interfaces import IComponentLookup
+from zope.publisher.interfaces.browser import IBrowserRequest
+from zope.schema import Choice
+from zope.schema import TextLine
+from zope.schema.interfaces import IChoice
+from zope.schema.interfaces import ITextLine
+
+import zope.formlib.tests
+from zope.formlib import form
+from zope.formlib import warmup
+from zope.formlib.interfaces import IInputWidget
+
+
+class IOrder(Interface):
+
+    title = TextLine(title='Title')
+    color = Choice(title='Color', values=['red', 'blue'])
+
+
+class OrderForm(form.EditForm):
+
+    form_fields = form.Fields(IOrder)
+    template = ViewPageTemplateFile(
+        'subpageform.pt', os.path.dirname(form.__file__))
+
+
+class ISite(Interface):
+    pass
+
+
+@implementer(ISite)
+class Site:
+
+    def __init__(self, sitemanager):
+        self.sitemanager = sitemanager
+
+    def getSiteManager(self):
+        return self.sitemanager
+
+
+class WarmUpTests(PlacelessSetup, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        xmlconfig.file('registerWidgets.zcml', zope.formlib.tests)
+
+    def _recordInputWidgets(self):
+        """Register input widgets for text lines and choices that record
+        the fields they are created for."""
+        created = []
+
+        def factory(field, request):
+            created.append(field)
+            return object()
+
+        for required in (ITextLine, IChoice):
+            provideAdapter(factory, (required, IBrowserRequest),
+                           IInputWidget)
+        return created
+
+    def test_formlibTemplates(self):
+        names = sorted(os.path.basename(template.filename)
+                       for template in warmup.formlibTemplates())
+        self.assertEqual(names, [
+            'objectwidget.pt', 'orderedSelectionList.pt', 'pageform.pt',
+            'pagewrapper.pt', 'sequencewidget.pt', 'subpageform.pt',
+            'widget_macros.pt'])
+
+    def test_compileTemplates(self):
+        templates = warmup.formlibTemplates()
+        for template in templates:
+            template._v_last_read = False
+        self.assertEqual(warmup.compileTemplates(), len(templates))
+        for template in templates:
+            self.assertTrue(template._v_last_read)
+            self.assertFalse(template._v_errors)
+
+    def test_warmWidgetLookups(self):
+        created = self._recordInputWidgets()
+        request = warmup.defaultRequest()
+        self.assertTrue(warmup.warmWidgetLookups(request) > 0)
+        self.assertTrue(any(type(field) is TextLine for field in created))
+
+    def test_warmWidgetLookups_skips_failing_fields(self):
+        field = Choice(vocabulary='not-registered')
+        self.assertEqual(
+            warmup.warmWidgetLookups(fields=[field, TextLine()]), 2)
+
+    def test_warmWidgetLookups_raises_other_errors(self):
+        class BrokenField(TextLine):
+            def bind(self, context):
+                raise AttributeError('broken')
+
+        self.assertRaises(AttributeError, warmup.warmWidgetLookups,
+                          fields=[BrokenField()])
+
+    def test_warmForms(self):
+        provideAdapter(OrderForm, (Interface, IBrowserRequest),
+                       Interface, name='order.html')
+        OrderForm.__dict__['template']._v_last_read = False
+        plans = OrderForm.form_fields.__FormFields_plans__
+        plans.clear()
+        created = self._recordInputWidgets()
+        request = warmup.defaultRequest()
+        self.assertEqual(warmup.warmForms(request=request), 1)
+        self.assertTrue(OrderForm.__dict__['template']._v_last_read)
+        self.assertIn('form', plans)
+        self.assertEqual([field.__name__ for field in created],
+                         ['title', 'color'])
+
+    def test_warmUp(self):
+        registry = getSiteManager()
+        provideAdapter(Site.getSiteManager, (ISite,), IComponentLookup)
+        provideAdapter(OrderForm, (Interface, IBrowserRequest),
+                       Interface, name='order.html')
+        plans = OrderForm.form_fields.__FormFields_plans__
+        plans.clear()
+        created = self._recordInputWidgets()
+        warmup.warmUp()
+        self.assertNotIn('form', plans)
+        self.assertTrue(any(type(field) is TextLine for field in created))
+        warmup.warmUp(site=Site(registry))
+        self.assertIn('form', plans)
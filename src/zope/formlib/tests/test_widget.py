@@ -13,6 +13,7 @@
 ##############################################################################
 """Generic Widget Tests
 """
+import unittest
 from doctest import DocTestSuite
 from unittest import TestSuite
 
@@ -221,5 +222,230 @@ class TestCustomWidgetFactory:
     """
 
 
+class FormInputIndexTests(unittest.TestCase):
+
+    def _makeRequest(self, **kw):
+        return TestRequest(form={'form.title': 'Title',
+                                 'form.body.used': '',
+                                 'form.tags-empty-marker': '1',
+                                 'other.title': 'Other'}, **kw)
+
+    def test_hasInput(self):
+        from zope.formlib.widget import FormInputIndex
+        index = FormInputIndex(self._makeRequest().form)
+        self.assertTrue(index.hasInput('form.'))
+        self.assertTrue(index.hasInput('form.body'))
+        self.assertTrue(index.hasInput('form.tags'))
+        self.assertTrue(index.hasInput(''))
+        self.assertFalse(index.hasInput('form.description'))
+        self.assertFalse(index.hasInput('subform.'))
+        self.assertFalse(index.hasInput('z'))
+
+    def test_inputNames(self):
+        from zope.formlib.widget import FormInputIndex
+        index = FormInputIndex(self._makeRequest().form)
+        self.assertEqual(
+            index.inputNames('form.'),
+            ['form.body.used', 'form.tags-empty-marker', 'form.title'])
+        self.assertEqual(index.inputNames('other.'), ['other.title'])
+        self.assertEqual(index.inputNames('missing.'), [])
+
+    def test_getFormInputIndex(self):
+        from zope.formlib.widget import getFormInputIndex
+        request = self._makeRequest()
+        index = getFormInputIndex(request)
+        self.assertIs(getFormInputIndex(request), index)
+        request.form['subform.title'] = 'Added'
+        index = getFormInputIndex(request)
+        self.assertTrue(index.hasInput('subform.'))
+        self.assertIs(getFormInputIndex(request), index)
+        # Replacing a name keeps the size of the form.
+        del request.form['other.title']
+        request.form['another.title'] = 'Replaced'
+        index = getFormInputIndex(request)
+        self.assertTrue(index.hasInput('another.'))
+        self.assertFalse(index.hasInput('other.'))
+
+
+class InputOutcomeTests(unittest.TestCase):
+
+    def setUp(self):
+        setUp()
+
+    def tearDown(self):
+        tearDown()
+
+    def _makeWidget(self, form, base=None):
+        from zope.schema import Int
+
+        from zope.formlib.widget import SimpleInputWidget
+        conversions = []
+
+        class IntWidget(base or SimpleInputWidget):
+            def _toFieldValue(self, input):
+                conversions.append(input)
+                return int(input)
+
+        field = Int(__name__='count', title='Count', min=0)
+        return IntWidget(field, TestRequest(form=form)), conversions
+
+    def test_render_reuses_input_value(self):
+        widget, conversions = self._makeWidget({'field.count': '42'})
+        self.assertEqual(widget.getInputValue(), 42)
+        self.assertIn('value="42"', widget())
+        self.assertEqual(conversions, ['42'])
+
+    def test_render_reuses_error(self):
+        from zope.formlib.interfaces import WidgetInputError
+        widget, conversions = self._makeWidget({'field.count': '-1'})
+        self.assertRaises(WidgetInputError, widget.getInputValue)
+        error = widget._error
+        self.assertIn('value="-1"', widget())
+        self.assertIs(widget._error, error)
+        self.assertEqual(conversions, ['-1'])
+
+    def test_changed_input_is_converted(self):
+        widget, conversions = self._makeWidget({'field.count': '1'})
+        widget.getInputValue()
+        widget.request.form['field.count'] = '2'
+        self.assertIn('value="2"', widget())
+        widget.setPrefix('other')
+        self.assertIn('value=""', widget())
+        self.assertEqual(conversions, ['1', '2'])
+
+    def test_getInputValue_always_converts(self):
+        widget, conversions = self._makeWidget({'field.count': '1'})
+        widget.getInputValue()
+        widget.getInputValue()
+        self.assertEqual(conversions, ['1', '1'])
+
+    def test_overridden_getInputValue(self):
+        from zope.formlib.widget import SimpleInputWidget
+
+        class Base(SimpleInputWidget):
+            def getInputValue(self):
+                return super().getInputValue() + 1
+
+        widget, conversions = self._makeWidget({'field.count': '1'}, Base)
+        self.assertEqual(widget.getInputValue(), 2)
+        self.assertIn('value="2"', widget())
+        self.assertEqual(conversions, ['1', '1'])
+
+
+class RenderTagTests(unittest.TestCase):
+
+    def _callFUT(self, tag, **kw):
+        from zope.formlib.widget import renderTag
+        return renderTag(tag, **kw)
+
+    def test_attributes_sorted(self):
+        self.assertEqual(
+            self._callFUT('input', value='v', name='n', id='i'),
+            '<input id="i" name="n" value="v"')
+        self.assertEqual(
+            self._callFUT('input', id='i', value='v', name='n'),
+            '<input id="i" name="n" value="v"')
+
+    def test_class_style_and_extra(self):
+        self.assertEqual(
+            self._callFUT('input', type='text', cssClass='c', style='a:b',
+                          extra='onclick="x"'),
+            '<input class="c textType" style="a:b" type="text"'
+            ' onclick="x"')
+        self.assertEqual(self._callFUT('br', extra=''), '<br ')
+        self.assertEqual(self._callFUT('br'), '<br')
+
+    def test_values_quoted_like_quoteattr(self):
+        from zope.formlib.widget import quoteattr
+        for value in ('', 'plain', 'a&b', '<b>', "it's", 'say "hi"',
+                      'both \'"', 'line\nbreak', '\ttab', 'ü'):
+            self.assertEqual(self._callFUT('input', value=value),
+                             '<input value=%s' % quoteattr(value))
+
+    def test_non_string_values(self):
+        self.assertEqual(self._callFUT('input', size=20, maxlength=0),
+                         '<input maxlength="0" size="20"')
+        self.assertEqual(self._callFUT('input', checked=True, step=0.5),
+                         '<input checked="True" step="0.5"')
+        self.assertEqual(self._callFUT('input', value=b'a&b'),
+                         '<input value="a&amp;b"')
+
+    def test_renderElementInto(self):
+        from zope.formlib.widget import renderElement
+        from zope.formlib.widget import renderElementInto
+        out = []
+        renderElementInto(out, 'br', cssClass='c')
+        renderElementInto(out, 'b', contents='text', id='i')
+        renderElementInto(out, 'p', contents=lambda out: out.extend('ab'))
+        self.assertEqual(
+            ''.join(out),
+            renderElement('br', cssClass='c') +
+            renderElement('b', contents='text', id='i') +
+            renderElement('p', contents='ab'))
+
+    def test_None_value_deprecated(self):
+        import warnings
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.assertEqual(self._callFUT('input', checked=None),
+                             '<input checked="checked"')
+        self.assertEqual(len(caught), 1)
+        self.assertIs(caught[0].category, DeprecationWarning)
+
+
+class ErrorSnippetTests(unittest.TestCase):
+
+    def setUp(self):
+        from zope.component import provideAdapter
+        from zope.interface import implementer
+        from zope.publisher.interfaces.browser import IBrowserRequest
+
+        from zope.formlib.interfaces import IWidgetInputError
+        from zope.formlib.interfaces import IWidgetInputErrorView
+        setUp()
+        self.views = []
+        views = self.views
+
+        @implementer(IWidgetInputErrorView)
+        class ErrorView:
+            def __init__(self, context, request):
+                self.context = context
+                views.append(self)
+
+            def snippet(self):
+                return '<span>%s</span>' % self.context.doc()
+
+        provideAdapter(ErrorView, (IWidgetInputError, IBrowserRequest),
+                       IWidgetInputErrorView)
+
+    def tearDown(self):
+        tearDown()
+
+    def _makeWidget(self):
+        from zope.schema import Int
+
+        from zope.formlib.widget import BrowserWidget
+        return BrowserWidget(Int(__name__='count'), TestRequest())
+
+    def test_error_is_memoized(self):
+        from zope.formlib.interfaces import WidgetInputError
+        widget = self._makeWidget()
+        widget._error = WidgetInputError('count', 'Count', 'Bad')
+        self.assertEqual(widget.error(), '<span>Bad</span>')
+        self.assertEqual(widget.error(), '<span>Bad</span>')
+        self.assertEqual(len(self.views), 1)
+        widget._error = WidgetInputError('count', 'Count', 'Worse')
+        self.assertEqual(widget.error(), '<span>Worse</span>')
+        self.assertEqual(len(self.views), 2)
+        widget._error = None
+        self.assertEqual(widget.error(), '')
+
+
 def test_suite():
-    return TestSuite(DocTestSuite(setUp=setUp, tearDown=tearDown))
+    return TestSuite((
+        DocTestSuite(setUp=setUp, tearDown=tearDown),
+        unittest.defaultTestLoader.loadTestsFromTestCase(FormInputIndexTests),
+        unittest.defaultTestLoader.loadTestsFromTestCase(InputOutcomeTests),
+        unittest.defaultTestLoader.loadTestsFromTestCase(RenderTagTests),
+        unittest.defaultTestLoader.loadTestsFromTestCase(ErrorSnippetTests),
+    ))
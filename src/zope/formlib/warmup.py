@@ -0,0 +1,246 @@
+##############################################################################
+#
+# Copyright (c) 2026 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Warm up formlib before a process takes traffic
+
+Page templates are compiled and widget adapters are looked up lazily,
+so the first requests after a process start pay for both (the adapter
+registry caches its lookups per specification).  The functions
+in this module do that work up front.  They are meant to be called once
+the component registrations are loaded, e.g. from a subscriber to
+`zope.processlifetime.IDatabaseOpenedWithRoot`::
+
+  from zope.formlib.warmup import warmUp
+  warmUp(site=root)
+
+Warming widget lookups only helps requests that provide the same
+interfaces as the request used for warming; pass a request marked with
+the skin used by the application if it is not the default skin.
+"""
+__docformat__ = 'restructuredtext'
+
+import os
+from io import BytesIO
+
+import zope.component
+import zope.schema
+from zope.pagetemplate.pagetemplatefile import PageTemplateFile
+from zope.publisher.browser import BrowserRequest
+from zope.publisher.skinnable import setDefaultSkin
+
+import zope.formlib
+from zope.formlib import form
+from zope.formlib import itemswidgets
+from zope.formlib import objectwidget
+from zope.formlib import sequencewidget
+from zope.formlib.interfaces import IDisplayWidget
+from zope.formlib.interfaces import IInputWidget
+
+
+_package = os.path.dirname(zope.formlib.__file__) + os.sep
+
+
+def _classTemplates(klass, names=('template', 'index')):
+    """Return the page templates defined on `klass` under `names`.
+
+    The class dictionaries are inspected directly, as page templates
+    defined on views are descriptors.
+    """
+    templates = []
+    for name in names:
+        for base in klass.__mro__:
+            if name in base.__dict__:
+                template = base.__dict__[name]
+                if isinstance(template, PageTemplateFile):
+                    templates.append(template)
+                break
+    return templates
+
+
+def _registeredClasses(registry):
+    for registration in registry.registeredAdapters():
+        factory = registration.factory
+        if isinstance(factory, type):
+            yield factory
+
+
+def _compile(template):
+    """Compile `template` unless it is compiled already.
+
+    zope.pagetemplate has no public method that only compiles a page
+    template; reading ``macros`` compiles it (and re-reads the file in
+    debug mode or if it changed) as a side effect.
+    """
+    template.macros
+
+
+def formlibTemplates(registry=None):
+    """Return the page templates of formlib.
+
+    This includes the templates of views registered from formlib's
+    configuration (like ``widget_macros``) in `registry`, which defaults
+    to the current site manager.
+    """
+    templates = [
+        form.default_page_template.descriptor,
+        form.default_subpage_template.descriptor,
+        form._page_template,
+    ]
+    for klass in (sequencewidget.SequenceWidget,
+                  itemswidgets.OrderedMultiSelectWidget,
+                  objectwidget.ObjectWidgetView):
+        templates.extend(_classTemplates(klass))
+    if registry is None:
+        registry = zope.component.getSiteManager()
+    for klass in _registeredClasses(registry):
+        for template in _classTemplates(klass):
+            if (template.filename.startswith(_package)
+                    and template not in templates):
+                templates.append(template)
+    return templates
+
+
+def compileTemplates(registry=None):
+    """Compile the page templates of formlib.
+
+    Return the number of templates compiled.
+    """
+    templates = formlibTemplates(registry)
+    for template in templates:
+        _compile(template)
+    return len(templates)
+
+
+def sampleFields():
+    """Return sample fields for the widgets formlib registers.
+
+    This is a subset: there is one field of each plain field type, but
+    fields whose widgets depend on the content object are left out, like
+    choices of named vocabularies or sources.  Use `warmForms` to warm
+    the widget lookups of such fields.
+    """
+    values = ['one', 'two']
+    fields = [
+        zope.schema.Field(),
+        zope.schema.Bool(),
+        zope.schema.Bytes(),
+        zope.schema.BytesLine(),
+        zope.schema.ASCII(),
+        zope.schema.ASCIILine(),
+        zope.schema.URI(),
+        zope.schema.Id(),
+        zope.schema.Date(),
+        zope.schema.Datetime(),
+        zope.schema.TextLine(),
+        zope.schema.Text(),
+        zope.schema.SourceText(),
+        zope.schema.Password(),
+        zope.schema.Int(),
+        zope.schema.Float(),
+        zope.schema.Decimal(),
+        zope.schema.Choice(values=values),
+    ]
+    for collection in (zope.schema.Tuple, zope.schema.List):
+        fields.append(collection(value_type=zope.schema.TextLine()))
+    for collection in (zope.schema.List, zope.schema.Set,
+                       zope.schema.FrozenSet):
+        fields.append(collection(value_type=zope.schema.Choice(
+            values=values)))
+    return fields
+
+
+def defaultRequest():
+    """Return an empty browser request using the default skin."""
+    request = BrowserRequest(BytesIO(), {})
+    setDefaultSkin(request)
+    return request
+
+
+class _Context:
+    """Placeholder context the fields are bound to."""
+
+
+def warmWidgetLookups(request=None, fields=None):
+    """Prime the widget lookups for `fields` and `request`.
+
+    `fields` default to `sampleFields()` and `request` defaults to
+    `defaultRequest()`.  Input and display widgets are created for every
+    field (bound to a placeholder context), which also primes the
+    lookups widgets do themselves (for vocabularies and value types).
+    Fields whose widgets can't be created outside of a real form (e.g.
+    because their vocabulary depends on the context or can't be found)
+    are skipped; other errors are raised.
+
+    Return the number of widgets created.
+    """
+    if request is None:
+        request = defaultRequest()
+    if fields is None:
+        fields = sampleFields()
+    context = _Context()
+    created = 0
+    for field in fields:
+        for interface in (IInputWidget, IDisplayWidget):
+            try:
+                widget = zope.component.queryMultiAdapter(
+                    (field.bind(context), request), interface)
+            except (LookupError, TypeError):
+                # Vocabularies that aren't registered or can't be bound
+                # to the placeholder context.
+                widget = None
+            if widget is not None:
+                created += 1
+    return created
+
+
+def warmForms(site=None, request=None):
+    """Warm the forms registered in `site`.
+
+    The forms are the `FormBase` subclasses registered as adapters in
+    the site manager of `site` (the current site manager if `site` is
+    None).  Their form plans are computed, their templates are compiled
+    and the widget lookups for their fields are primed.
+
+    Return the number of forms warmed.
+    """
+    if request is None:
+        request = defaultRequest()
+    registry = zope.component.getSiteManager(site)
+    warmed = 0
+    seen = set()
+    for klass in _registeredClasses(registry):
+        if not issubclass(klass, form.FormBase) or klass in seen:
+            continue
+        seen.add(klass)
+        for template in _classTemplates(klass):
+            _compile(template)
+        form_fields = getattr(klass, 'form_fields', None)
+        if isinstance(form_fields, form.FormFields):
+            form.getFormPlan(form_fields, klass.prefix)
+            warmWidgetLookups(
+                request, [form_field.field for form_field in form_fields])
+        warmed += 1
+    return warmed
+
+
+def warmUp(request=None, site=None):
+    """Compile formlib's templates and prime its widget lookups.
+
+    If `site` is given, the forms registered in it are warmed as well.
+    """
+    if request is None:
+        request = defaultRequest()
+    compileTemplates()
+    warmWidgetLookups(request)
+    if site is not None:
+        warmForms(site, request)
@@ -15,6 +15,8 @@
 """
 __docformat__ = 'restructuredtext'
 
+import bisect
+import re
 import warnings
 from xml.sax.saxutils import escape
 from xml.sax.saxutils import quoteattr
@@ -192,25 +194,49 @@ class BrowserWidget(Widget, BrowserView):
         >>> widget.error()
         "The error: ('Err1', 'Err2')"
 
+    The snippet is computed once per error; a new error gets a new snippet:
+
+        >>> widget.error() is widget.error()
+        True
+        >>> widget._error = WidgetInputError('foo', 'Foo', ('Err3',))
+        >>> widget.error()
+        "The error: ('Err3',)"
+
     >>> tearDown()
 
     """
 
     _error = None
+    _error_snippet = None
+
+    # Whether `hasInput` only looks at form variables starting with the
+    # widget name.  Forms don't ask such widgets for input if no form
+    # variable starts with the form prefix.
+    _form_input_only = True
 
     def __init__(self, context, request):
         super().__init__(context, request)
         self.required = context.required
 
     def error(self):
-        if self._error:
-            return getMultiAdapter((self._error, self.request),
-                                   IWidgetInputErrorView).snippet()
-        return ""
+        error = self._error
+        if not error:
+            return ""
+        # Forms render the error more than once per request; remember the
+        # snippet until a different error is set.
+        cached = self._error_snippet
+        if cached is None or cached[0] is not error:
+            cached = self._error_snippet = (
+                error, errorSnippet(error, self.request))
+        return cached[1]
 
     def hidden(self):
         return ""
 
+    def renderInto(self, out):
+        """See IBrowserWidget."""
+        out.append(self())
+
 
 @implementer(ISimpleInputWidget)
 class SimpleInputWidget(BrowserWidget, InputWidget):
@@ -397,34 +423,53 @@ class SimpleInputWidget(BrowserWidget, InputWidget):
         """
         return self.name in self.request.form
 
+    # The outcome of the last `getInputValue` call: the widget name, the
+    # form input, and the converted value and error.
+    _input_outcome = None
+
     def getInputValue(self):
         self._error = None
-        field = self.context
 
         # form input is required, otherwise raise an error
         if not self.hasInput():
             raise MissingInputError(self.name, self.label, None)
 
+        input = self._getFormInput()
+        value, error = self._convertInput(input)
+        # Remember the outcome for rendering the widget.
+        self._input_outcome = self.name, input, value, error
+        if error is not None:
+            self._error = error
+            raise error
+        return value
+
+    def _convertInput(self, input):
+        """Convert form input to a valid field value.
+
+        Return a ``(value, error)`` tuple, where the error is the
+        `WidgetInputError` if the input could not be converted or is not
+        valid.
+        """
+        field = self.context
+
         # convert input to suitable value - may raise conversion error
         try:
-            value = self._toFieldValue(self._getFormInput())
+            value = self._toFieldValue(input)
         except ConversionError as error:
             # ConversionError is already a WidgetInputError
-            self._error = error
-            raise self._error
+            return None, error
 
         # allow missing values only for non-required fields
         if value == field.missing_value and not field.required:
-            return value
+            return value, None
 
         # value must be valid per the field constraints
         try:
             field.validate(value)
         except ValidationError as v:
-            self._error = WidgetInputError(
+            return None, WidgetInputError(
                 self.context.__name__, self.label, v)
-            raise self._error
-        return value
+        return value, None
 
     def _getFormInput(self):
         """Returns current form input.
@@ -476,7 +521,14 @@ class SimpleInputWidget(BrowserWidget, InputWidget):
         if self._renderedValueSet():
             input_value = self._data
         else:
-            if self.hasInput():
+            outcome = self._getInputOutcome()
+            if outcome is not None:
+                # The input was already converted, e.g. when the form
+                # data were extracted; don't convert it again.
+                input_value, error = outcome
+                if error is not None:
+                    raise error
+            elif self.hasInput():
                 # It's insane to use getInputValue this way. It can
                 # cause _error to get set spuriously.  We'll work
                 # around this by saving and restoring _error if
@@ -490,6 +542,22 @@ class SimpleInputWidget(BrowserWidget, InputWidget):
                 input_value = self._getDefault()
         return input_value
 
+    def _getInputOutcome(self):
+        """Return the ``(value, error)`` outcome of `getInputValue`.
+
+        None is returned if `getInputValue` wasn't called for the current
+        input, or if a subclass overrides it.
+        """
+        outcome = self._input_outcome
+        if (outcome is None
+                or type(self).getInputValue
+                is not SimpleInputWidget.getInputValue
+                or outcome[0] != self.name
+                or not self.hasInput()
+                or outcome[1] != self._getFormInput()):
+            return None
+        return outcome[2:]
+
     def _getCurrentValue(self):
         """Returns the current input value.
 
@@ -569,9 +637,85 @@ class UnicodeDisplayWidget(DisplayWidget):
         return escape(toStr(value))
 
 
+class FormInputIndex:
+    """Index of the names submitted in a request form.
+
+    The names are kept sorted, so the names starting with a given
+    prefix (for example, the prefix of a form or widget) are found
+    without looking at every name.
+    """
+
+    def __init__(self, form):
+        self.form = form
+        self.keys = frozenset(form)
+        self.names = sorted(self.keys)
+
+    def isCurrent(self, form):
+        """Return whether the index is still valid for `form`.
+
+        Comparing the names is cheaper than sorting them again.
+        """
+        return form is self.form and form.keys() == self.keys
+
+    def hasInput(self, prefix):
+        """Return whether any submitted name starts with `prefix`."""
+        names = self.names
+        i = bisect.bisect_left(names, prefix)
+        return i < len(names) and names[i].startswith(prefix)
+
+    def inputNames(self, prefix):
+        """Return the submitted names starting with `prefix`, sorted."""
+        names = self.names
+        i = j = bisect.bisect_left(names, prefix)
+        while j < len(names) and names[j].startswith(prefix):
+            j += 1
+        return names[i:j]
+
+
+def getFormInputIndex(request):
+    """Return the `FormInputIndex` of the form submitted with `request`.
+
+    The index is built once and stored on the request.  It is rebuilt if
+    the names in the request form changed.
+    """
+    form = request.form
+    annotations = getattr(request, 'annotations', None)
+    if annotations is None:
+        return FormInputIndex(form)
+    index = annotations.get('zope.formlib.input')
+    if index is None or not index.isCurrent(form):
+        index = annotations['zope.formlib.input'] = FormInputIndex(form)
+    return index
+
+
+# Characters `quoteattr` would replace in an attribute value.
+_needsQuoting = re.compile('[&<>"\n\r\t]').search
+
+# Sorted attribute names by the names passed to `renderTag`.
+_attributeOrder = {}
+_attributeOrderSize = 1000
+
+
+def _quoteAttributeValue(value):
+    """Quote `value` like `quoteattr`, skipping the escaping of safe values.
+    """
+    if type(value) is str:
+        if _needsQuoting(value) is None:
+            return '"%s"' % value
+    elif type(value) is int:
+        return '"%d"' % value
+    return quoteattr(toStr(value))
+
+
+def errorSnippet(error, request):
+    """Render `error` using its `IWidgetInputErrorView`."""
+    return getMultiAdapter(
+        (error, request), IWidgetInputErrorView).snippet()
+
+
 def renderTag(tag, **kw):
     """Render the tag. Well, not all of it, as we may want to / it."""
-    attr_list = []
+    parts = [tag]
 
     # special case handling for cssClass
     cssClass = kw.pop('cssClass', '')
@@ -584,13 +728,16 @@ def renderTag(tag, **kw):
     cssWidgetType = kw.get('type', '')
     if cssWidgetType:
         cssWidgetType += 'Type'
-    names = [c for c in (cssClass, cssWidgetType) if c]
-    if names:
-        attr_list.append('class="%s"' % ' '.join(names))
+        if cssClass:
+            parts.append(f'class="{cssClass} {cssWidgetType}"')
+        else:
+            parts.append('class="%s"' % cssWidgetType)
+    elif cssClass:
+        parts.append('class="%s"' % cssClass)
 
     style = kw.pop('style', '')
     if style:
-        attr_list.append('style=%s' % quoteattr(style))
+        parts.append('style=%s' % quoteattr(style))
 
     # special case handling for extra 'raw' code
     if 'extra' in kw:
@@ -601,8 +748,14 @@ def renderTag(tag, **kw):
 
     # handle other attributes
     if kw:
-        items = sorted(kw.items())
-        for key, value in items:
+        names = tuple(kw)
+        order = _attributeOrder.get(names)
+        if order is None:
+            order = tuple(sorted(names))
+            if len(_attributeOrder) < _attributeOrderSize:
+                _attributeOrder[names] = order
+        for key in order:
+            value = kw[key]
             if value is None:
                 warnings.warn(
                     "None was passed for attribute %r.  Passing None "
@@ -612,13 +765,9 @@ def renderTag(tag, **kw):
                     % key,
                     DeprecationWarning, stacklevel=2)
                 value = key
-            attr_list.append(f'{key}={quoteattr(toStr(value))}')
+            parts.append(f'{key}={_quoteAttributeValue(value)}')
 
-    if attr_list:
-        attr_str = " ".join(attr_list)
-        return f"<{tag} {attr_str}{extra}"
-    else:
-        return f"<{tag}{extra}"
+    return '<%s%s' % (' '.join(parts), extra)
 
 
 def renderElement(tag, **kw):
@@ -630,6 +779,23 @@ def renderElement(tag, **kw):
         return renderTag(tag, **kw) + " />"
 
 
+def renderElementInto(out, tag, **kw):
+    """Append the element `renderElement` would return to the list `out`.
+
+    `contents` may also be a callable, which is called with `out` to
+    append the contents of the element.
+    """
+    contents = kw.pop('contents', None)
+    if contents is None:
+        out.append(renderTag(tag, **kw) + " />")
+    elif callable(contents):
+        out.append(renderTag(tag, **kw) + ">")
+        contents(out)
+        out.append("</%s>" % tag)
+    else:
+        out.append(f"{renderTag(tag, **kw)}>{contents}</{tag}>")
+
+
 def setUp():
     import zope.component.testing
     global setUp